@@ -1,16 +1,26 @@
 import requests
-import json
+import orjson
 from database import Database
-from collections import Counter
+from ttl_cache import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
 import time
 
+# Market aggregates only change when scrapers run
+_MARKET_CACHE = TTLCache(maxsize=1, ttl=60)
+
+# Completed LLM responses, keyed by a hash of the request payload
+LLM_CACHE_DIR = 'data/llm_cache'
+LLM_CACHE_TTL = 24 * 60 * 60
+
 class AICareerAdvisor:
     def __init__(self):
         self.db = Database()
         self.ollama_url = "http://localhost:11434/api/generate"
         self.model = "llama3.2"
     
-    def ask_ollama(self, prompt, system_prompt="", max_tokens=500):
+    def ask_ollama(self, prompt, system_prompt="", max_tokens=500, show_progress=True):
         """Query Ollama with context - STREAMING for faster response"""
         full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
         
@@ -24,25 +34,40 @@ class AICareerAdvisor:
             }
         }
         
+        # Identical prompts (same user, role and market snapshot) reuse the last answer
+        cache_path = self._cache_path(payload)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            return cached
+        
         try:
-            print("🤖 AI thinking", end="", flush=True)
+            if show_progress:
+                print("🤖 AI thinking", end="", flush=True)
             response = requests.post(self.ollama_url, json=payload, stream=True, timeout=120)
             response.raise_for_status()
             
             full_response = ""
+            done = False
             for line in response.iter_lines():
                 if line:
                     try:
-                        chunk = json.loads(line)
+                        chunk = orjson.loads(line)
                         if 'response' in chunk:
                             full_response += chunk['response']
-                            print(".", end="", flush=True)
+                            if show_progress:
+                                print(".", end="", flush=True)
                         if chunk.get('done', False):
+                            done = True
                             break
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         continue
             
-            print(" ✓\n")
+            if show_progress:
+                print(" ✓\n")
+            
+            # Only a complete answer is reused; a cut-off stream would be served for a day
+            if done and full_response:
+                self._write_cache(cache_path, full_response)
             return full_response
             
         except requests.exceptions.Timeout:
@@ -50,34 +75,51 @@ class AICareerAdvisor:
         except Exception as e:
             return f"Error: {e}\nMake sure Ollama is running."
     
+    def _cache_path(self, payload):
+        """Cache file for a request payload"""
+        key = hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return os.path.join(LLM_CACHE_DIR, f"{key}.txt")
+    
+    def _read_cache(self, path):
+        """Return a cached response if present and not expired"""
+        try:
+            if time.time() - os.path.getmtime(path) > LLM_CACHE_TTL:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _write_cache(self, path, response):
+        """Store a completed response"""
+        try:
+            os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(response)
+        except OSError as e:
+            print(f"⚠️  Could not cache response: {e}")
+    
     def get_market_context(self):
         """Get real market data as context"""
+        cached = _MARKET_CACHE.get('market_context')
+        if cached is not None:
+            return cached
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        # Get skill frequencies
-        cursor.execute("""
-            SELECT extracted_skills 
-            FROM jobs 
-            WHERE is_active = TRUE 
-            AND extracted_skills IS NOT NULL
-            LIMIT 100
-        """)
-        
-        all_skills = []
-        for (skills_json,) in cursor.fetchall():
-            if skills_json and skills_json != '[]':
-                try:
-                    skills = json.loads(skills_json)
-                    all_skills.extend(skills)
-                except:
-                    pass
-        
-        skill_counts = Counter(all_skills)
-        
-        # Get salary data
+        # Skill frequencies (precomputed in skill_stats by NLPProcessor) and
+        # salary averages in one round-trip
         cursor.execute("""
+            WITH top_skills AS (
+                SELECT skill, job_count AS cnt
+                FROM skill_stats
+                ORDER BY job_count DESC
+                LIMIT 20
+            )
             SELECT 
+                (SELECT json_agg(json_build_array(skill, cnt) ORDER BY cnt DESC) 
+                 FROM top_skills) as top_skills,
                 AVG(salary_min) as avg_min,
                 AVG(salary_max) as avg_max,
                 COUNT(*) as jobs_with_salary
@@ -86,17 +128,21 @@ class AICareerAdvisor:
             AND salary_min IS NOT NULL
         """)
         
-        salary_data = cursor.fetchone()
+        top_skills_json, *salary_data = cursor.fetchone()
+        top_skills = [tuple(pair) for pair in top_skills_json or []]
         
         cursor.close()
         self.db.return_connection(conn)
         
-        return {
-            'top_skills': skill_counts.most_common(20),
+        market_context = {
+            'top_skills': top_skills,
             'avg_salary_min': salary_data[0] if salary_data[0] else 0,
             'avg_salary_max': salary_data[1] if salary_data[1] else 0,
             'jobs_with_salary': salary_data[2]
         }
+        _MARKET_CACHE.set('market_context', market_context)
+        
+        return market_context
     
     def analyze_skill_gap(self, user_skills, target_role="Software Engineer"):
         """AI-powered skill gap analysis"""
@@ -107,6 +153,38 @@ class AICareerAdvisor:
         # Get real market context
         market_data = self.get_market_context()
         
+        prompt = self.build_gap_prompt(user_skills, target_role, market_data)
+        
+        print(f"\n📊 Current Skills: {', '.join(user_skills)}")
+        print(f"🎯 Target: {target_role}\n")
+        
+        response = self.ask_ollama(prompt, max_tokens=400)
+        
+        print(response)
+        print("\n" + "=" * 60)
+        
+        return response, market_data
+    
+    def analyze_skill_gaps(self, profiles, max_workers=4):
+        """Run skill gap analyses for several (user_skills, target_role) profiles.
+        
+        Ollama requests are I/O-bound, so they run on a thread pool and overlap
+        instead of waiting on each other. Returns responses in input order.
+        """
+        market_data = self.get_market_context()
+        prompts = [self.build_gap_prompt(skills, role, market_data) for skills, role in profiles]
+        
+        print(f"🤖 Running {len(prompts)} analyses...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(
+                lambda prompt: self.ask_ollama(prompt, max_tokens=400, show_progress=False),
+                prompts
+            ))
+        
+        return responses, market_data
+    
+    def build_gap_prompt(self, user_skills, target_role, market_data):
+        """Build the skill gap prompt from user profile and market data"""
         top_10_skills = ', '.join([f'{skill}({count})' for skill, count in market_data['top_skills'][:10]])
         
         # SHORTER, FOCUSED PROMPT
@@ -124,15 +202,7 @@ List:
 
 Keep it brief and actionable."""
         
-        print(f"\n📊 Current Skills: {', '.join(user_skills)}")
-        print(f"🎯 Target: {target_role}\n")
-        
-        response = self.ask_ollama(prompt, max_tokens=400)
-        
-        print(response)
-        print("\n" + "=" * 60)
-        
-        return response, market_data
+        return prompt
     
     def generate_quick_roadmap(self, user_skills, missing_skills, market_data):
         """Generate quick learning roadmap"""
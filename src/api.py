@@ -1,7 +1,11 @@
-from flask import Flask, jsonify, request
+from flask import Flask, request, Response
 from flask_cors import CORS
+from flask_compress import Compress
 from database import Database
+from psycopg2.extras import RealDictCursor
+from ttl_cache import TTLCache
 from datetime import datetime, timedelta
+import orjson
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -9,11 +13,31 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend access
 
+# Compress JSON bodies (field names and company/location strings repeat heavily).
+# Streamed responses are compressed chunk by chunk as they are generated;
+# Flask-Compress can't stream gzip, so those fall back to deflate.
+app.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_ALGORITHM_STREAMING=['br', 'deflate'],
+    COMPRESS_LEVEL=6,
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_MIN_SIZE=500,
+    COMPRESS_STREAMS=True
+)
+Compress(app)
+
 db = Database()
 
+# Aggregates only change when scrapers run, so serve them from memory for a minute
+_STATS_CACHE = TTLCache(maxsize=32, ttl=60)
+
+def json_response(data):
+    """Serialize a response body with orjson (faster than Flask's stdlib-based encoder)"""
+    return Response(orjson.dumps(data), mimetype='application/json')
+
 @app.route('/')
 def home():
-    return jsonify({
+    return json_response({
         'message': 'Job Market Intelligence API',
         'version': '1.0',
         'endpoints': {
@@ -27,139 +51,129 @@ def home():
         }
     })
 
+def stream_rows(sql, params, key='jobs', **fields):
+    """Stream query results as a JSON object, serializing rows as they are fetched.
+    
+    Rows come back as dicts from a RealDictCursor and are written under `key`.
+    Extra keyword fields are written before the array; 'count' is written
+    after it, once all rows have been sent.
+    """
+    def generate():
+        conn = db.get_read_connection()
+        # Server-side cursor; libpq fills the row dicts, no per-field Python mapping.
+        # WITH HOLD lets it outlive the implicit commit on an autocommit connection.
+        cursor = conn.cursor(name='rows_stream', cursor_factory=RealDictCursor, withhold=True)
+        cursor.itersize = 500
+        
+        try:
+            cursor.execute(sql, params)
+            
+            yield b'{' + b''.join(
+                orjson.dumps(name) + b':' + orjson.dumps(value) + b','
+                for name, value in fields.items()
+            ) + orjson.dumps(key) + b':['
+            
+            count = 0
+            for row in cursor:
+                yield (b',' if count else b'') + orjson.dumps(row)
+                count += 1
+            
+            yield b'],"count":' + str(count).encode() + b'}'
+        finally:
+            cursor.close()
+            db.return_read_connection(conn)
+    
+    return Response(generate(), mimetype='application/json')
+
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
     """Get all active jobs"""
     limit = request.args.get('limit', 100, type=int)
     offset = request.args.get('offset', 0, type=int)
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT job_id, title, company, location, salary_min, salary_max, 
+    # Salaries are cast in SQL so rows serialize as-is (0 is treated as undisclosed)
+    return stream_rows("""
+        SELECT job_id, title, company, location, 
+               NULLIF(salary_min, 0)::float8 AS salary_min,
+               NULLIF(salary_max, 0)::float8 AS salary_max, 
                requirements, url, source, posted_date
         FROM jobs 
         WHERE is_active = TRUE
         ORDER BY scraped_at DESC
         LIMIT %s OFFSET %s
     """, (limit, offset))
-    
-    jobs = []
-    for row in cursor.fetchall():
-        jobs.append({
-            'job_id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'location': row[3],
-            'salary_min': float(row[4]) if row[4] else None,
-            'salary_max': float(row[5]) if row[5] else None,
-            'requirements': row[6],
-            'url': row[7],
-            'source': row[8],
-            'posted_date': row[9].isoformat() if row[9] else None
-        })
-    
-    cursor.close()
-    db.return_connection(conn)
-    
-    return jsonify({
-        'count': len(jobs),
-        'jobs': jobs
-    })
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get database statistics"""
-    conn = db.get_connection()
-    cursor = conn.cursor()
+    cached = _STATS_CACHE.get(request.full_path)
+    if cached is not None:
+        return json_response(cached)
     
-    # Total jobs
-    cursor.execute("SELECT COUNT(*) FROM jobs WHERE is_active = TRUE")
-    total_jobs = cursor.fetchone()[0]
-    
-    # By source
-    cursor.execute("""
-        SELECT source, COUNT(*) 
-        FROM jobs 
-        WHERE is_active = TRUE
-        GROUP BY source
-    """)
-    by_source = {row[0]: row[1] for row in cursor.fetchall()}
+    conn = db.get_read_connection()
+    cursor = conn.cursor()
     
-    # Top locations
+    # All aggregates in one statement; Postgres builds the JSON document and
+    # psycopg2 decodes it straight into dicts/lists
     cursor.execute("""
-        SELECT location, COUNT(*) as cnt
-        FROM jobs 
-        WHERE is_active = TRUE
-        GROUP BY location
-        ORDER BY cnt DESC
-        LIMIT 10
+        WITH active AS (
+            SELECT source, location, salary_min, salary_max
+            FROM jobs 
+            WHERE is_active = TRUE
+        ),
+        by_source AS (
+            SELECT COALESCE(source, 'unknown') as source, COUNT(*) as cnt
+            FROM active
+            GROUP BY 1
+        ),
+        top_locations AS (
+            SELECT location, COUNT(*) as cnt
+            FROM active
+            GROUP BY location
+            ORDER BY cnt DESC
+            LIMIT 10
+        ),
+        salary AS (
+            SELECT 
+                ROUND(AVG(salary_min), 2)::float8 as average_min,
+                ROUND(AVG(salary_max), 2)::float8 as average_max,
+                COUNT(*) as jobs_with_salary
+            FROM active
+            WHERE salary_min IS NOT NULL
+        )
+        SELECT json_build_object(
+            'total_jobs', (SELECT COUNT(*) FROM active),
+            'by_source', COALESCE(
+                (SELECT json_object_agg(source, cnt) FROM by_source), '{}'::json),
+            'top_locations', COALESCE(
+                (SELECT json_agg(json_build_object('location', location, 'count', cnt) 
+                                 ORDER BY cnt DESC) 
+                 FROM top_locations), '[]'::json),
+            'salary_stats', (SELECT row_to_json(salary) FROM salary)
+        )
     """)
-    top_locations = [{'location': row[0], 'count': row[1]} for row in cursor.fetchall()]
-    
-    # Salary stats
-    cursor.execute("""
-        SELECT 
-            AVG(salary_min) as avg_min,
-            AVG(salary_max) as avg_max,
-            COUNT(*) as with_salary
-        FROM jobs 
-        WHERE is_active = TRUE AND salary_min IS NOT NULL
-    """)
-    salary_row = cursor.fetchone()
-    salary_stats = {
-        'average_min': round(float(salary_row[0]), 2) if salary_row[0] else None,
-        'average_max': round(float(salary_row[1]), 2) if salary_row[1] else None,
-        'jobs_with_salary': salary_row[2]
-    }
+    stats = cursor.fetchone()[0]
     
     cursor.close()
-    db.return_connection(conn)
+    db.return_read_connection(conn)
     
-    return jsonify({
-        'total_jobs': total_jobs,
-        'by_source': by_source,
-        'top_locations': top_locations,
-        'salary_stats': salary_stats,
-        'generated_at': datetime.now().isoformat()
-    })
+    stats['generated_at'] = datetime.now().isoformat()
+    _STATS_CACHE.set(request.full_path, stats)
+    
+    return json_response(stats)
 
 @app.route('/api/recent', methods=['GET'])
 def get_recent():
     """Get jobs from last 24 hours"""
     hours = request.args.get('hours', 24, type=int)
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    return stream_rows("""
         SELECT job_id, title, company, location, source, scraped_at
         FROM jobs 
         WHERE is_active = TRUE 
         AND scraped_at >= NOW() - INTERVAL '%s hours'
         ORDER BY scraped_at DESC
-    """, (hours,))
-    
-    jobs = []
-    for row in cursor.fetchall():
-        jobs.append({
-            'job_id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'location': row[3],
-            'source': row[4],
-            'scraped_at': row[5].isoformat()
-        })
-    
-    cursor.close()
-    db.return_connection(conn)
-    
-    return jsonify({
-        'count': len(jobs),
-        'hours': hours,
-        'jobs': jobs
-    })
+    """, (hours,), hours=hours)
 
 @app.route('/api/search', methods=['GET'])
 def search_jobs():
@@ -168,9 +182,6 @@ def search_jobs():
     location = request.args.get('location', '')
     company = request.args.get('company', '')
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
     sql = """
         SELECT job_id, title, company, location, url, source
         FROM jobs 
@@ -192,30 +203,10 @@ def search_jobs():
     
     sql += " ORDER BY scraped_at DESC LIMIT 50"
     
-    cursor.execute(sql, params)
-    
-    jobs = []
-    for row in cursor.fetchall():
-        jobs.append({
-            'job_id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'location': row[3],
-            'url': row[4],
-            'source': row[5]
-        })
-    
-    cursor.close()
-    db.return_connection(conn)
-    
-    return jsonify({
-        'count': len(jobs),
-        'search_params': {
-            'query': query,
-            'location': location,
-            'company': company
-        },
-        'jobs': jobs
+    return stream_rows(sql, params, search_params={
+        'query': query,
+        'location': location,
+        'company': company
     })
 
 @app.route('/api/logs', methods=['GET'])
@@ -223,32 +214,12 @@ def get_logs():
     """Get scraping logs"""
     limit = request.args.get('limit', 20, type=int)
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    return stream_rows("""
         SELECT run_time, success, jobs_scraped, error_message
         FROM scraping_logs
         ORDER BY run_time DESC
         LIMIT %s
-    """, (limit,))
-    
-    logs = []
-    for row in cursor.fetchall():
-        logs.append({
-            'run_time': row[0].isoformat(),
-            'success': row[1],
-            'jobs_scraped': row[2],
-            'error_message': row[3]
-        })
-    
-    cursor.close()
-    db.return_connection(conn)
-    
-    return jsonify({
-        'count': len(logs),
-        'logs': logs
-    })
+    """, (limit,), key='logs')
 
 if __name__ == '__main__':
     print("=" * 60)
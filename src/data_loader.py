@@ -3,19 +3,22 @@ from database import Database
 import json
 from datetime import datetime
 
+# Columns with few distinct values relative to row count
+CATEGORY_COLUMNS = ['source', 'company', 'location']
+
 class DataLoader:
     def __init__(self):
         self.db = Database()
     
-    def load_jobs_to_dataframe(self, chunk_size=1000):
+    def load_jobs_to_dataframe(self):
         """Load jobs into pandas DataFrame efficiently"""
         print("=" * 60)
         print("📊 LOADING DATA INTO PANDAS")
         print("=" * 60)
         
         conn = self.db.get_connection()
+        cursor = conn.cursor()
         
-        # Use chunksize for memory efficiency with large datasets
         query = """
             SELECT 
                 job_id, title, company, location, 
@@ -26,15 +29,15 @@ class DataLoader:
             WHERE is_active = TRUE
         """
         
-        print(f"\n🔄 Loading data in chunks of {chunk_size}...")
-        
-        # Load in chunks and concatenate
-        chunks = []
-        for chunk in pd.read_sql(query, conn, chunksize=chunk_size):
-            chunks.append(chunk)
+        print(f"\n🔄 Loading data...")
         
-        df = pd.concat(chunks, ignore_index=True)
+        # Build the frame once from the fetched rows - reading in chunks and
+        # concatenating copies every row twice for no gain at this table size
+        cursor.execute(query)
+        columns = [desc[0] for desc in cursor.description]
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
         
+        cursor.close()
         self.db.return_connection(conn)
         
         print(f"✅ Loaded {len(df)} jobs into DataFrame")
@@ -48,13 +51,10 @@ class DataLoader:
         
         initial_memory = df.memory_usage(deep=True).sum() / 1024**2
         
-        # Optimize dtypes
-        # Convert object columns with few unique values to category
-        for col in df.select_dtypes(include=['object']).columns:
-            num_unique = df[col].nunique()
-            num_total = len(df[col])
-            
-            if num_unique / num_total < 0.5:  # Less than 50% unique
+        # Known low-cardinality columns go straight to category - no need
+        # to scan every text column with nunique() to find them
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
                 df[col] = df[col].astype('category')
         
         final_memory = df.memory_usage(deep=True).sum() / 1024**2
@@ -1,7 +1,49 @@
 import re
+import os
+from collections import deque
+from multiprocessing import Pool
 from datetime import datetime
 from database import Database
+from psycopg2.extras import execute_batch
 import pandas as pd
+import numpy as np
+
+UPDATE_JOB_SQL = """
+    UPDATE jobs 
+    SET title = %s,
+        company = %s,
+        location = %s,
+        description = %s,
+        requirements = %s
+    WHERE id = %s
+"""
+
+CLEAN_COLUMNS = ['id', 'title', 'company', 'location', 'description', 'requirements']
+
+# Compiled once at import instead of per call in the cleaning methods
+_TITLE_CLEAN = re.compile(r'[^\w\s\-/().,&+#]')
+_WS = re.compile(r'\s+')
+_HTML = re.compile(r'<[^>]+>')
+_CTRL = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+
+# One pass over the location: each lookahead scans the whole string, so the
+# worldwide > USA > Europe priority holds no matter where the keyword appears.
+# The named group that matched selects the canonical label.
+_LOC_RE = re.compile(
+    r'^(?:(?=.*?(?P<ww>anywhere|worldwide|global))'
+    r'|(?=.*?(?P<us>usa|united states|us only))'
+    r'|(?=.*?(?P<eu>europe|eu)))',
+    re.IGNORECASE
+)
+_LOC_MAP = {
+    'ww': 'Remote - Worldwide',
+    'us': 'Remote - USA',
+    'eu': 'Remote - Europe'
+}
+
+def clean_batch(rows):
+    """Clean a batch of CLEAN_COLUMNS rows (module-level so Pool workers can run it)"""
+    return DataProcessor.clean_frame(pd.DataFrame(rows, columns=CLEAN_COLUMNS))
 
 class DataProcessor:
     def __init__(self):
@@ -9,168 +51,148 @@ class DataProcessor:
         self.cleaned_count = 0
         self.errors = []
     
-    def clean_all_jobs(self):
+    def clean_all_jobs(self, batch_size=500, processes=None):
         """Main cleaning pipeline"""
         print("=" * 60)
         print("🧹 DATA CLEANING PIPELINE")
         print("=" * 60)
         
+        processes = processes or os.cpu_count() or 1
         conn = self.db.get_connection()
-        cursor = conn.cursor()
         
-        # Fetch all jobs
-        cursor.execute("SELECT * FROM jobs")
-        jobs = cursor.fetchall()
+        # Server-side cursor streams rows instead of loading the whole table;
+        # WITH HOLD keeps it open across the per-batch commits below
+        read_cursor = conn.cursor(name='clean_jobs_scan', withhold=True)
+        write_cursor = conn.cursor()
         
-        print(f"\n📊 Processing {len(jobs)} jobs...")
-        
-        for job in jobs:
-            try:
-                cleaned_job = self.clean_job(job)
-                if cleaned_job:
-                    self.update_job(cleaned_job)
-                    self.cleaned_count += 1
-            except Exception as e:
-                self.errors.append(f"Job ID {job[0]}: {e}")
-        
-        cursor.close()
-        self.db.return_connection(conn)
+        try:
+            read_cursor.execute("""
+                SELECT id, title, company, location, description, requirements
+                FROM jobs
+            """)
+            conn.commit()  # Commit the DECLARE so a failed batch can't roll the cursor back
+            
+            print(f"\n📊 Processing jobs in batches of {batch_size} on {processes} processes...")
+            
+            # Regex cleaning is CPU-bound, so batches are cleaned in worker
+            # processes while this process keeps fetching and writing
+            with Pool(processes) as pool:
+                pending = deque()
+                for rows in self._fetch_batches(read_cursor, batch_size):
+                    pending.append((rows[0][0], pool.apply_async(clean_batch, (rows,))))
+                    
+                    # Bound the number of batches in flight
+                    if len(pending) >= processes * 2:
+                        self._write_cleaned(conn, write_cursor, *pending.popleft())
+                
+                while pending:
+                    self._write_cleaned(conn, write_cursor, *pending.popleft())
+        finally:
+            read_cursor.close()
+            write_cursor.close()
+            self.db.return_connection(conn)
         
         self.print_summary()
     
-    def clean_job(self, job):
-        """Clean individual job record"""
-        # job tuple: (id, job_id, title, company, location, salary_min, salary_max, 
-        #             description, requirements, url, source, posted_date, scraped_at, is_active)
-        
-        job_dict = {
-            'id': job[0],
-            'job_id': job[1],
-            'title': self.clean_title(job[2]),
-            'company': self.clean_company(job[3]),
-            'location': self.standardize_location(job[4]),
-            'salary_min': job[5],
-            'salary_max': job[6],
-            'description': self.clean_text(job[7]),
-            'requirements': self.clean_requirements(job[8]),
-            'url': job[9],
-            'source': job[10],
-            'posted_date': job[11],
-            'scraped_at': job[12],
-            'is_active': job[13]
-        }
-        
-        return job_dict
-    
-    def clean_title(self, title):
-        """Standardize job titles"""
-        if not title or title == 'N/A':
-            return 'Unknown Position'
-        
-        # Remove extra whitespace
-        title = ' '.join(title.split())
-        
-        # Remove special characters but keep common ones
-        title = re.sub(r'[^\w\s\-/().,&+#]', '', title)
-        
-        # Capitalize properly
-        title = title.title()
-        
-        return title.strip()
+    def _fetch_batches(self, cursor, batch_size):
+        """Yield lists of up to batch_size rows from cursor"""
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
     
-    def clean_company(self, company):
-        """Standardize company names"""
-        if not company or company == 'N/A':
-            return 'Unknown Company'
-        
-        # Remove extra whitespace
-        company = ' '.join(company.split())
-        
-        # Remove common suffixes for consistency (optional)
-        # company = re.sub(r',?\s*(Inc\.?|LLC|Ltd\.?|Corporation|Corp\.?)$', '', company, flags=re.IGNORECASE)
+    def _write_cleaned(self, conn, cursor, first_id, result):
+        """Wait for a worker's cleaned batch and write it"""
+        try:
+            batch = result.get()
+        except Exception as e:
+            self.errors.append(f"Batch starting at job ID {first_id}: {e}")
+            return
         
-        return company.strip()
-    
-    def standardize_location(self, location):
-        """Standardize location formats"""
-        if not location:
-            return 'Remote - Worldwide'
-        
-        location = ' '.join(location.split())
-        
-        # Common patterns
-        if re.search(r'(anywhere|worldwide|global)', location, re.IGNORECASE):
-            return 'Remote - Worldwide'
-        elif re.search(r'(usa|united states|us only)', location, re.IGNORECASE):
-            return 'Remote - USA'
-        elif re.search(r'(europe|eu)', location, re.IGNORECASE):
-            return 'Remote - Europe'
-        elif location.lower() == 'remote':
-            return 'Remote - Worldwide'
-        
-        return location.strip()
+        self.write_batch(conn, cursor, batch)
     
-    def clean_text(self, text):
-        """Clean description and long text fields"""
-        if not text:
-            return ''
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove HTML tags if any
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
-        
-        return text.strip()
+    @staticmethod
+    def clean_frame(df):
+        """Clean a batch of jobs column-wise, returning UPDATE parameter tuples.
+        
+        Missing or 'N/A' titles and companies get placeholders, whitespace is
+        collapsed, locations map to canonical remote labels, descriptions lose
+        HTML and control characters, and requirements are deduplicated.
+        """
+        # Titles (special characters dropped, then title-cased)
+        titles = df['title'].fillna('')
+        titles = (titles.str.split().str.join(' ')
+                  .str.replace(_TITLE_CLEAN, '', regex=True)
+                  .str.title()
+                  .str.strip())
+        titles = titles.mask(df['title'].isin(['', 'N/A']) | df['title'].isna(), 'Unknown Position')
+        
+        # Companies
+        companies = df['company'].fillna('').str.split().str.join(' ').str.strip()
+        companies = companies.mask(df['company'].isin(['', 'N/A']) | df['company'].isna(), 'Unknown Company')
+        
+        # Locations
+        locations = df['location'].fillna('').str.split().str.join(' ')
+        matches = locations.str.extract(_LOC_RE)
+        locations = pd.Series(np.select(
+            [matches[group].notna() for group in _LOC_MAP] + [locations.str.lower() == 'remote'],
+            list(_LOC_MAP.values()) + ['Remote - Worldwide'],
+            default=locations.str.strip()
+        ), index=df.index)
+        locations = locations.mask(df['location'].isin(['']) | df['location'].isna(), 'Remote - Worldwide')
+        
+        # Descriptions
+        descriptions = (df['description'].fillna('')
+                        .str.replace(_WS, ' ', regex=True)
+                        .str.replace(_HTML, '', regex=True)
+                        .str.replace(_CTRL, '', regex=True)
+                        .str.strip())
+        
+        # Requirements (split/dedupe is inherently per-row)
+        requirements = df['requirements'].fillna('').map(DataProcessor.clean_requirements)
+        
+        return list(zip(
+            titles.tolist(),
+            companies.tolist(),
+            locations.tolist(),
+            descriptions.tolist(),
+            requirements.tolist(),
+            df['id'].tolist()
+        ))
     
-    def clean_requirements(self, requirements):
+    @staticmethod
+    def clean_requirements(requirements):
         """Standardize requirements/skills"""
         if not requirements:
             return ''
         
-        # Split by comma, clean each, remove duplicates
-        skills = [skill.strip().lower() for skill in requirements.split(',')]
-        skills = list(dict.fromkeys(skills))  # Remove duplicates while preserving order
-        
-        # Remove empty strings
-        skills = [s for s in skills if s]
+        # Split by comma, clean each, drop empties and duplicates (order preserved) in one pass
+        parts = (skill.strip().lower() for skill in requirements.split(','))
+        skills = list(dict.fromkeys(s for s in parts if s))
         
         # Limit to top 20 skills
-        skills = skills[:20]
-        
-        return ', '.join(skills)
+        return ', '.join(skills[:20])
     
-    def update_job(self, job_dict):
-        """Update cleaned job in database"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
+    def write_batch(self, conn, cursor, batch):
+        """Write a batch of cleaned jobs in a single transaction"""
         try:
-            cursor.execute("""
-                UPDATE jobs 
-                SET title = %s,
-                    company = %s,
-                    location = %s,
-                    description = %s,
-                    requirements = %s
-                WHERE id = %s
-            """, (
-                job_dict['title'],
-                job_dict['company'],
-                job_dict['location'],
-                job_dict['description'],
-                job_dict['requirements'],
-                job_dict['id']
-            ))
-            
+            execute_batch(cursor, UPDATE_JOB_SQL, batch, page_size=len(batch))
             conn.commit()
-            
+            self.cleaned_count += len(batch)
         except Exception as e:
             conn.rollback()
-            raise e
+            self.errors.append(f"Batch of {len(batch)} jobs starting at ID {batch[0][-1]}: {e}")
+    
+    def update_job(self, job):
+        """Clean a single job (a dict with CLEAN_COLUMNS keys) and write it"""
+        batch = clean_batch([tuple(job[col] for col in CLEAN_COLUMNS)])
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self.write_batch(conn, cursor, batch)
         finally:
             cursor.close()
             self.db.return_connection(conn)
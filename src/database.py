@@ -1,20 +1,63 @@
 import psycopg2
 from psycopg2 import pool
+from contextlib import contextmanager
+from psycopg2.extras import register_default_json, register_default_jsonb, execute_values
+import orjson
 import os
+import threading
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Decode json/jsonb query results with orjson instead of the stdlib parser
+register_default_json(globally=True, loads=orjson.loads)
+register_default_jsonb(globally=True, loads=orjson.loads)
+
+# Server-side settings for API read connections: reject writes, cap runaway queries
+READ_OPTIONS = '-c default_transaction_read_only=on -c statement_timeout=30000'
+
+# Columns scrapers provide for each job (keys of their job_data dicts)
+JOB_INSERT_COLUMNS = [
+    'job_id', 'title', 'company', 'location', 'salary_min', 'salary_max',
+    'description', 'requirements', 'url', 'source', 'posted_date'
+]
+
+# Fields refreshed when a scraped job already exists
+JOB_UPDATE_COLUMNS = [
+    'title', 'company', 'location', 'salary_min', 'salary_max',
+    'description', 'requirements'
+]
+
 class Database:
     def __init__(self):
-        self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-            1, 20,
+        self.connect_params = dict(
             host=os.getenv('DB_HOST', 'localhost'),
             database=os.getenv('DB_NAME', 'job_market_db'),
             user=os.getenv('DB_USER', 'postgres'),
             password=os.getenv('DB_PASSWORD'),
             port=os.getenv('DB_PORT', '5432')
         )
+        
+        # Threaded pool: connections are handed out to concurrent API/scraper threads
+        self.min_connections = int(os.getenv('DB_MIN', 1))
+        self.max_connections = int(os.getenv('DB_MAX', 20))
+        self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
+            self.min_connections, self.max_connections, **self.connect_params
+        )
+        
+        # Read-only pool for API handlers, created on first use
+        self.read_pool = None
+        self._read_pool_lock = threading.Lock()
+    
+    @property
+    def uri(self):
+        """postgresql:// URI for the same database, for clients that don't take a psycopg2 connection"""
+        params = self.connect_params
+        credentials = quote(params['user'], safe='')
+        if params['password']:
+            credentials += ':' + quote(params['password'], safe='')
+        return f"postgresql://{credentials}@{params['host']}:{params['port']}/{params['database']}"
     
     def get_connection(self):
         return self.connection_pool.getconn()
@@ -22,6 +65,62 @@ class Database:
     def return_connection(self, conn):
         self.connection_pool.putconn(conn)
     
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; it goes back to the pool even if the block raises"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            self.return_connection(conn)
+    
+    def get_read_connection(self):
+        """Get a read-only autocommit connection (no BEGIN/COMMIT round-trips per request)"""
+        if self.read_pool is None:
+            with self._read_pool_lock:
+                if self.read_pool is None:
+                    self.read_pool = psycopg2.pool.ThreadedConnectionPool(
+                        5, self.max_connections, options=READ_OPTIONS, **self.connect_params
+                    )
+        
+        conn = self.read_pool.getconn()
+        if not conn.autocommit:
+            conn.set_session(readonly=True, autocommit=True)
+        return conn
+    
+    def return_read_connection(self, conn):
+        self.read_pool.putconn(conn)
+    
+    def bulk_upsert_jobs(self, jobs, update_columns=JOB_UPDATE_COLUMNS, page_size=500):
+        """Insert or update scraped job dicts in pages of page_size rows.
+        
+        Existing jobs (by job_id) get update_columns refreshed and scraped_at bumped.
+        Returns the number of jobs written, or 0 if the batch failed.
+        """
+        # ON CONFLICT can't touch the same row twice in one statement; keep the last copy
+        rows = list({job['job_id']: tuple(job[col] for col in JOB_INSERT_COLUMNS) for job in jobs}.values())
+        if not rows:
+            return 0
+        
+        updates = ''.join(f"{col} = EXCLUDED.{col}, " for col in update_columns)
+        
+        # Each page is a single statement, parsed once by the server; a per-row
+        # PREPARE/EXECUTE would trade that for a round-trip per job
+        with self.connection() as conn, conn.cursor() as cursor:
+            try:
+                execute_values(cursor, f"""
+                    INSERT INTO jobs ({', '.join(JOB_INSERT_COLUMNS)})
+                    VALUES %s
+                    ON CONFLICT (job_id) DO UPDATE SET
+                        {updates}scraped_at = CURRENT_TIMESTAMP
+                """, rows, page_size=page_size)
+                conn.commit()
+                return len(rows)
+            except Exception as e:
+                print(f"        ❌ Database save error: {e}")
+                conn.rollback()
+                return 0
+    
     def create_tables(self):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -46,6 +145,47 @@ class Database:
             )
         """)
         
+        # Per-skill job counts, rebuilt by NLPProcessor after skill extraction
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS skill_stats (
+                skill TEXT PRIMARY KEY,
+                job_count INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_skill_stats_job_count
+            ON skill_stats (job_count DESC)
+        """)
+        
+        # Active listings ordered by recency (/api/jobs, /api/recent, /api/search)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_active_scraped
+            ON jobs (scraped_at DESC) WHERE is_active
+        """)
+        
+        # Per-company counts over active listings (OpportunityScorer, company stats);
+        # scraped_at is included so TrendAnalyzer's active-days count is index-only.
+        # Replaces the earlier key-only idx_jobs_company_active.
+        cursor.execute("DROP INDEX IF EXISTS idx_jobs_company_active")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_company_scraped_active
+            ON jobs (company) INCLUDE (scraped_at) WHERE is_active
+        """)
+        
+        # Per-location counts and salary averages (TrendAnalyzer location trends)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_location_salary_active
+            ON jobs (location) INCLUDE (salary_min, salary_max) WHERE is_active
+        """)
+        
+        # Trigram indexes so ILIKE '%term%' searches don't need a sequential scan
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in ('title', 'requirements', 'location', 'company'):
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_jobs_{column}_trgm
+                ON jobs USING gin ({column} gin_trgm_ops)
+            """)
+        
         conn.commit()
         cursor.close()
         self.return_connection(conn)
@@ -1,66 +1,106 @@
 from database import Database
+import psycopg2
+from itertools import groupby
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from difflib import SequenceMatcher
+import numpy as np
+import os
+
+# rapidfuzz computes the same ratio in C; fall back to difflib if it's missing
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
+# Rows per process.cdist call in similar_pairs (bounds memory for large company blocks)
+CDIST_ROWS = 1000
+
+# pg_trgm similarity a same-company title pair needs before Postgres returns it
+# for the ratio check; set per query so the server default (0.3) doesn't apply
+TRGM_PREFILTER_THRESHOLD = 0.2
+
+def difflib_ratio(str1, str2, threshold=0.0):
+    """SequenceMatcher ratio with fast paths; returns 0.0 early when it can't reach threshold"""
+    if str1 == str2:
+        return 1.0
+    if not str1 or not str2:
+        return 0.0
+    
+    # The ratio can't exceed 2*min(len)/total: if lengths alone rule out the
+    # threshold, skip building the matcher (it indexes the second string)
+    shorter, longer = sorted((str1, str2), key=len)
+    if 2 * len(shorter) < threshold * (len(shorter) + len(longer)):
+        return 0.0
+    
+    # A prefix is one matching block: ratio is 2*M/T (autojunk only kicks in at 200+ chars)
+    if len(longer) < 200 and longer.startswith(shorter):
+        return 2 * len(shorter) / (len(shorter) + len(longer))
+    
+    matcher = SequenceMatcher(None, str1, str2)
+    # Character-multiset upper bound before the full O(n*m) ratio
+    if matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+def similar_pairs(titles, threshold, workers=1):
+    """Return (i, j, similarity) for i < j where the titles' ratio >= threshold.
+    
+    Module-level so process pool workers can run it.
+    """
+    if process is None:
+        # Blocking by length: the ratio can't exceed 2*len(shorter)/total, so with
+        # titles sorted by length each one is only compared against the window of
+        # longer titles that could still reach the threshold
+        order = sorted(range(len(titles)), key=lambda k: len(titles[k]))
+        pairs = []
+        for pos, k in enumerate(order):
+            shortest = len(titles[k])
+            for m in order[pos + 1:]:
+                if 2 * shortest < threshold * (shortest + len(titles[m])):
+                    break  # Every later title is at least as long
+                
+                i, j = min(k, m), max(k, m)
+                title_similarity = difflib_ratio(titles[i], titles[j], threshold)
+                if title_similarity >= threshold:
+                    pairs.append((i, j, title_similarity))
+        pairs.sort()
+        return pairs
+    
+    # Score the block in C, CDIST_ROWS titles at a time against the titles from
+    # there on, so a large company holds a CDIST_ROWS x n uint8 slice instead of
+    # a dense n x n float matrix. Scores below the cutoff come back as 0.
+    pairs = []
+    for start in range(0, len(titles), CDIST_ROWS):
+        scores = process.cdist(titles[start:start + CDIST_ROWS], titles[start:], scorer=fuzz.ratio,
+                               score_cutoff=threshold * 100, dtype=np.uint8, workers=workers)
+        rows, cols = np.nonzero(scores)
+        upper = rows < cols  # Same offset on both axes, so this keeps i < j
+        for i, j in zip((rows[upper] + start).tolist(), (cols[upper] + start).tolist()):
+            # uint8 scores are rounded; report the exact ratio for the few matches
+            pairs.append((i, j, fuzz.ratio(titles[i], titles[j]) / 100))
+    return pairs
 
 class DuplicateDetector:
     def __init__(self):
         self.db = Database()
         self.duplicates_found = 0
     
-    def find_duplicates(self, similarity_threshold=0.85):
+    def find_duplicates(self, similarity_threshold=0.85, use_trgm=True):
         """Find potential duplicate jobs"""
         print("=" * 60)
         print("🔍 DUPLICATE DETECTION")
         print("=" * 60)
         
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        # Get all jobs
-        cursor.execute("""
-            SELECT id, job_id, title, company, url 
-            FROM jobs 
-            WHERE is_active = TRUE
-            ORDER BY scraped_at DESC
-        """)
-        
-        jobs = cursor.fetchall()
-        print(f"\n📊 Analyzing {len(jobs)} jobs...")
+        duplicates = None
+        if use_trgm:
+            try:
+                duplicates = self.find_duplicates_in_db(similarity_threshold)
+            except psycopg2.Error as e:
+                print(f"\n⚠️  Trigram search unavailable ({str(e).strip()}), comparing in Python")
         
-        duplicates = []
-        checked = set()
-        
-        for i, job1 in enumerate(jobs):
-            for job2 in jobs[i+1:]:
-                # Skip if already checked
-                pair = tuple(sorted([job1[0], job2[0]]))
-                if pair in checked:
-                    continue
-                checked.add(pair)
-                
-                # Check if same source and ID (exact duplicate)
-                if job1[1] == job2[1]:
-                    duplicates.append({
-                        'job1_id': job1[0],
-                        'job2_id': job2[0],
-                        'reason': 'Exact ID match',
-                        'similarity': 1.0
-                    })
-                    continue
-                
-                # Check title + company similarity
-                if job1[3] == job2[3]:  # Same company
-                    title_similarity = self.similarity(job1[2], job2[2])
-                    
-                    if title_similarity >= similarity_threshold:
-                        duplicates.append({
-                            'job1_id': job1[0],
-                            'job2_id': job2[0],
-                            'reason': f'Similar title at same company',
-                            'similarity': title_similarity,
-                            'title1': job1[2],
-                            'title2': job2[2],
-                            'company': job1[3]
-                        })
+        if duplicates is None:
+            duplicates = self.find_duplicates_local(similarity_threshold)
         
         print(f"\n⚠️  Found {len(duplicates)} potential duplicates")
         
@@ -74,29 +114,170 @@ class DuplicateDetector:
                     print(f"   Title 2: {dup['title2']}")
                     print(f"   Company: {dup['company']}")
         
-        cursor.close()
-        self.db.return_connection(conn)
+        return duplicates
+    
+    def find_duplicates_in_db(self, similarity_threshold):
+        """Find duplicate candidates with a pg_trgm self-join inside Postgres.
+        
+        Approximate: Postgres only returns same-company pairs whose titles are
+        equal (NULL counts as '') or reach TRGM_PREFILTER_THRESHOLD trigram
+        similarity, and the title ratio is confirmed here. Trigram similarity
+        isn't a strict bound on the ratio, so a rare pair that
+        find_duplicates_local reports can be missed. Exact ID matches are the
+        same in both paths.
+        """
+        with self.db.connection() as conn, conn.cursor() as cursor:
+            try:
+                duplicates = self.exact_id_duplicates(cursor)
+                
+                cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                               (str(TRGM_PREFILTER_THRESHOLD),))
+                
+                # Similar titles at the same company: '%' is the pre-filter; equal
+                # titles (including two NULLs) always reach a ratio of 1.0
+                cursor.execute("""
+                    SELECT a.id, b.id, a.title, b.title, a.company
+                    FROM jobs a
+                    JOIN jobs b 
+                      ON lower(btrim(COALESCE(a.company, ''))) = lower(btrim(COALESCE(b.company, '')))
+                     AND a.id < b.id
+                    WHERE a.is_active AND b.is_active
+                    AND a.job_id IS DISTINCT FROM b.job_id
+                    AND (a.title % b.title
+                         OR lower(COALESCE(a.title, '')) = lower(COALESCE(b.title, '')))
+                """)
+                candidates = cursor.fetchall()
+            finally:
+                conn.rollback()
+        
+        print(f"\n📊 Checking {len(candidates)} candidate pairs from Postgres...")
+        
+        for job1_id, job2_id, title1, title2, company in candidates:
+            title_similarity = self.similarity(title1 or '', title2 or '', similarity_threshold)
+            if title_similarity >= similarity_threshold:
+                duplicates.append({
+                    'job1_id': job1_id,
+                    'job2_id': job2_id,
+                    'reason': f'Similar title at same company',
+                    'similarity': title_similarity,
+                    'title1': title1,
+                    'title2': title2,
+                    'company': company
+                })
         
         return duplicates
     
-    def similarity(self, str1, str2):
-        """Calculate similarity between two strings"""
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+    def find_duplicates_local(self, similarity_threshold, workers=None):
+        """Find duplicates by comparing titles in Python, one company block at a time.
+        
+        Rows are streamed from a server-side cursor ordered by company and blocks
+        are scored in parallel, with at most workers * 2 blocks held in memory.
+        """
+        duplicates = []
+        workers = workers or os.cpu_count() or 1
+        
+        # rapidfuzz releases the GIL in its C core, so threads are enough;
+        # the pure-Python difflib fallback needs processes
+        executor_cls = ThreadPoolExecutor if process is not None else ProcessPoolExecutor
+        
+        with self.db.connection() as conn:
+            with conn.cursor() as cursor:
+                duplicates.extend(self.exact_id_duplicates(cursor))
+            
+            # Similar titles only matter within the same company, so compare per company block
+            with conn.cursor(name='dup_scan') as cursor:
+                cursor.itersize = 1000
+                cursor.execute("""
+                    SELECT id, job_id, title, company, url,
+                           lower(btrim(COALESCE(company, ''))) AS company_key
+                    FROM jobs 
+                    WHERE is_active = TRUE
+                    ORDER BY company_key, scraped_at DESC
+                """)
+                
+                analyzed = 0
+                pending = deque()
+                with executor_cls(max_workers=workers) as executor:
+                    for _, rows in groupby(cursor, key=lambda job: job[5]):
+                        block = list(rows)
+                        analyzed += len(block)
+                        if len(block) < 2:
+                            continue
+                        
+                        titles = [(job[2] or '').lower() for job in block]
+                        pending.append((block, executor.submit(similar_pairs, titles, similarity_threshold)))
+                        
+                        # Keep the pool busy without buffering the whole table
+                        if len(pending) >= workers * 2:
+                            self.collect_block(*pending.popleft(), duplicates)
+                    
+                    while pending:
+                        self.collect_block(*pending.popleft(), duplicates)
+            
+            conn.rollback()
+        
+        print(f"\n📊 Analyzed {analyzed} jobs")
+        
+        return duplicates
     
-    def mark_duplicate(self, job_id):
-        """Mark a job as inactive (soft delete)"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+    def exact_id_duplicates(self, cursor):
+        """Pairs of active jobs with the same source job_id, newest first.
         
+        GROUP BY puts NULL job_ids in one group, so those are paired too.
+        """
         cursor.execute("""
-            UPDATE jobs 
-            SET is_active = FALSE 
-            WHERE id = %s
-        """, (job_id,))
-        
-        conn.commit()
-        cursor.close()
-        self.db.return_connection(conn)
+            SELECT array_agg(id ORDER BY scraped_at DESC)
+            FROM jobs
+            WHERE is_active = TRUE
+            GROUP BY job_id
+            HAVING COUNT(*) > 1
+        """)
+        
+        duplicates = []
+        for (ids,) in cursor.fetchall():
+            for i, job1_id in enumerate(ids):
+                for job2_id in ids[i+1:]:
+                    duplicates.append({
+                        'job1_id': job1_id,
+                        'job2_id': job2_id,
+                        'reason': 'Exact ID match',
+                        'similarity': 1.0
+                    })
+        return duplicates
+    
+    def collect_block(self, block, future, duplicates):
+        """Append a scored company block's similar-title pairs to duplicates"""
+        for i, j, title_similarity in future.result():
+            job1, job2 = block[i], block[j]
+            if job1[1] == job2[1]:
+                continue  # Already reported as an exact match
+            
+            duplicates.append({
+                'job1_id': job1[0],
+                'job2_id': job2[0],
+                'reason': f'Similar title at same company',
+                'similarity': title_similarity,
+                'title1': job1[2],
+                'title2': job2[2],
+                'company': job1[3]
+            })
+    
+    def similarity(self, str1, str2, threshold=0.0):
+        """Calculate similarity between two strings (0.0 if it can't reach threshold)"""
+        if process is not None:
+            return fuzz.ratio(str1.lower(), str2.lower(), score_cutoff=threshold * 100) / 100
+        return difflib_ratio(str1.lower(), str2.lower(), threshold)
+    
+    def mark_duplicate(self, job_id):
+        """Mark a job as inactive (soft delete)"""
+        with self.db.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE jobs 
+                SET is_active = FALSE 
+                WHERE id = %s
+            """, (job_id,))
+            
+            conn.commit()
 
 if __name__ == "__main__":
     detector = DuplicateDetector()
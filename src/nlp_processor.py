@@ -1,7 +1,41 @@
 import re
-from collections import Counter
+from functools import lru_cache
+from collections import Counter, defaultdict
 from database import Database
-import json
+from psycopg2.extras import execute_values
+
+# Salary range patterns, tried in order
+_SALARY_PATTERNS = [
+    re.compile(r'\$(\d{1,3}(?:,\d{3})*(?:k)?)\s*-\s*\$(\d{1,3}(?:,\d{3})*(?:k)?)', re.IGNORECASE),  # $100k - $150k
+    re.compile(r'(\d{1,3}(?:,\d{3})*)\s*-\s*(\d{1,3}(?:,\d{3})*)', re.IGNORECASE),  # 100000 - 150000
+    re.compile(r'\$(\d{1,3})k\s*-\s*\$(\d{1,3})k', re.IGNORECASE),  # $100k - $150k
+]
+
+# Experience keywords (substring matches) in one scan; each lookahead covers the
+# whole text, so Senior > Junior > Mid-Level priority is kept
+_EXP_RE = re.compile(
+    r'^(?:(?=.*?(?P<senior>senior|sr\.|lead|principal|staff|architect))'
+    r'|(?=.*?(?P<junior>junior|jr\.|entry|graduate|associate))'
+    r'|(?=.*?(?P<mid>mid-level|intermediate|mid level)))',
+    re.DOTALL
+)
+_EXP_LEVELS = {
+    'senior': 'Senior',
+    'junior': 'Junior',
+    'mid': 'Mid-Level'
+}
+
+# Reposted jobs repeat the same titles and boilerplate, so extraction results
+# are memoized on the (lowercased) input text
+EXTRACT_CACHE_SIZE = 8192
+
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def _experience_level(text):
+    """Experience level for lowercased text (cached)"""
+    match = _EXP_RE.match(text)
+    if match:
+        return _EXP_LEVELS[match.lastgroup]
+    return 'Not specified'
 
 class NLPProcessor:
     def __init__(self):
@@ -43,51 +77,62 @@ class NLPProcessor:
         self.all_skills = set()
         for category, skills in self.tech_skills.items():
             self.all_skills.update(skills)
+        
+        # Reverse lookup for categorize_skills
+        self._skill_to_cat = {skill: category for category, skills in self.tech_skills.items() for skill in skills}
+        
+        # One alternation over every skill, longest first so 'sql server' wins over 'sql';
+        # a job's text is scanned once instead of once per skill
+        self._skill_re = re.compile(
+            r'\b(?:' + '|'.join(re.escape(s) for s in sorted(self.all_skills, key=len, reverse=True)) + r')\b'
+        )
+        
+        # Skills found inside longer ones ('sql' in 'sql server'), which the
+        # non-overlapping scan consumes
+        self._contained_skills = {
+            skill: [other for other in self.all_skills
+                    if other != skill and re.search(r'\b' + re.escape(other) + r'\b', skill)]
+            for skill in self.all_skills
+        }
+        
+        # Per-instance memo of _scan_skills (the scan depends on this instance's skill list)
+        self._cached_scan = lru_cache(maxsize=EXTRACT_CACHE_SIZE)(self._scan_skills)
     
     def extract_skills(self, text):
         """Extract technical skills from text"""
         if not text:
             return []
         
-        text = text.lower()
-        found_skills = []
-        
-        for skill in self.all_skills:
-            # Use word boundaries for exact matches
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text):
-                found_skills.append(skill)
+        # Copy so callers can't mutate the cached result
+        return list(self._cached_scan(text.lower()))
+    
+    def _scan_skills(self, text):
+        """Skills found in lowercased text, as a tuple in order of appearance"""
+        found_skills = dict.fromkeys(self._skill_re.findall(text))
+        for skill in list(found_skills):
+            found_skills.update(dict.fromkeys(self._contained_skills[skill]))
         
-        return found_skills
+        return tuple(found_skills)
     
     def categorize_skills(self, skills):
         """Categorize extracted skills"""
-        categorized = {category: [] for category in self.tech_skills.keys()}
+        categorized = defaultdict(list)
         
         for skill in skills:
-            for category, skill_list in self.tech_skills.items():
-                if skill in skill_list:
-                    categorized[category].append(skill)
-        
-        # Remove empty categories
-        categorized = {k: v for k, v in categorized.items() if v}
+            category = self._skill_to_cat.get(skill)
+            if category:
+                categorized[category].append(skill)
         
-        return categorized
+        # Keep the category order of tech_skills (empty categories are left out)
+        return {k: categorized[k] for k in self.tech_skills if k in categorized}
     
     def extract_salary_from_text(self, text):
         """Extract salary information from text"""
         if not text:
             return None, None
         
-        # Common salary patterns
-        patterns = [
-            r'\$(\d{1,3}(?:,\d{3})*(?:k)?)\s*-\s*\$(\d{1,3}(?:,\d{3})*(?:k)?)',  # $100k - $150k
-            r'(\d{1,3}(?:,\d{3})*)\s*-\s*(\d{1,3}(?:,\d{3})*)',  # 100000 - 150000
-            r'\$(\d{1,3})k\s*-\s*\$(\d{1,3})k',  # $100k - $150k
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _SALARY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 min_sal = self._parse_salary(match.group(1))
                 max_sal = self._parse_salary(match.group(2))
@@ -120,16 +165,7 @@ class NLPProcessor:
         if not text:
             return 'Not specified'
         
-        text = text.lower()
-        
-        if any(word in text for word in ['senior', 'sr.', 'lead', 'principal', 'staff', 'architect']):
-            return 'Senior'
-        elif any(word in text for word in ['junior', 'jr.', 'entry', 'graduate', 'associate']):
-            return 'Junior'
-        elif any(word in text for word in ['mid-level', 'intermediate', 'mid level']):
-            return 'Mid-Level'
-        else:
-            return 'Not specified'
+        return _experience_level(text.lower())
     
     def process_all_jobs(self):
         """Process all jobs and extract insights"""
@@ -142,13 +178,20 @@ class NLPProcessor:
         
         # First, add columns if they don't exist
         try:
+            self.migrate_skills_column(cursor)
             cursor.execute("""
                 ALTER TABLE jobs 
-                ADD COLUMN IF NOT EXISTS extracted_skills TEXT,
+                ADD COLUMN IF NOT EXISTS extracted_skills TEXT[],
                 ADD COLUMN IF NOT EXISTS experience_level VARCHAR(50)
             """)
+            # Server-side skill filtering (&&, @>, <@)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_skills_gin
+                ON jobs USING gin (extracted_skills)
+            """)
             conn.commit()
-        except:
+        except Exception as e:
+            print(f"⚠️  Column setup error: {e}")
             conn.rollback()
         
         # Get all jobs
@@ -178,7 +221,7 @@ class NLPProcessor:
             experience_levels.append(exp_level)
             
             # Store for batch update
-            updates.append((json.dumps(skills), exp_level, job_id))
+            updates.append((skills, exp_level, job_id))
             
             if idx % 10 == 0:
                 print(f"   Processed {idx}/{len(jobs)} jobs...")
@@ -186,24 +229,81 @@ class NLPProcessor:
         # Batch update all jobs
         print(f"\n💾 Updating database...")
         try:
-            cursor.executemany("""
+            # One UPDATE ... FROM (VALUES ...) per 500 rows instead of a round-trip per job
+            execute_values(cursor, """
                 UPDATE jobs 
-                SET extracted_skills = %s,
-                    experience_level = %s
-                WHERE id = %s
-            """, updates)
+                SET extracted_skills = data.skills,
+                    experience_level = data.exp
+                FROM (VALUES %s) AS data(skills, exp, id)
+                WHERE jobs.id = data.id
+            """, updates, template="(%s::text[], %s, %s)", page_size=500)
             conn.commit()
             print(f"   ✅ Updated {len(updates)} jobs")
         except Exception as e:
             print(f"   ⚠️  Update error: {e}")
             conn.rollback()
         
+        self.refresh_skill_stats(conn, cursor)
+        
         cursor.close()
         self.db.return_connection(conn)
         
         # Generate insights
         self.generate_insights(all_skills, experience_levels, len(jobs))
     
+    def migrate_skills_column(self, cursor):
+        """One-time conversion of a legacy JSON-text extracted_skills column to TEXT[]"""
+        cursor.execute("""
+            SELECT data_type 
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+            AND table_name = 'jobs' 
+            AND column_name = 'extracted_skills'
+        """)
+        row = cursor.fetchone()
+        if not row or row[0] != 'text':
+            return
+        
+        # USING can't contain a subquery, so backfill a new column and swap it in
+        print("🔄 Converting extracted_skills from JSON text to TEXT[]...")
+        cursor.execute("ALTER TABLE jobs ADD COLUMN extracted_skills_arr TEXT[]")
+        cursor.execute("""
+            UPDATE jobs 
+            SET extracted_skills_arr = ARRAY(SELECT jsonb_array_elements_text(extracted_skills::jsonb))
+            WHERE extracted_skills IS NOT NULL
+        """)
+        cursor.execute("ALTER TABLE jobs DROP COLUMN extracted_skills")
+        cursor.execute("ALTER TABLE jobs RENAME COLUMN extracted_skills_arr TO extracted_skills")
+    
+    def refresh_skill_stats(self, conn, cursor):
+        """Rebuild the skill_stats summary table from active jobs' skills"""
+        print(f"\n📊 Refreshing skill statistics...")
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS skill_stats (
+                    skill TEXT PRIMARY KEY,
+                    job_count INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_skill_stats_job_count
+                ON skill_stats (job_count DESC)
+            """)
+            cursor.execute("TRUNCATE skill_stats")
+            cursor.execute("""
+                INSERT INTO skill_stats (skill, job_count)
+                SELECT skill, COUNT(*)
+                FROM jobs, unnest(extracted_skills) AS skill
+                WHERE is_active = TRUE
+                AND extracted_skills IS NOT NULL
+                GROUP BY skill
+            """)
+            conn.commit()
+            print(f"   ✅ Stored counts for {cursor.rowcount} skills")
+        except Exception as e:
+            print(f"   ⚠️  Skill stats error: {e}")
+            conn.rollback()
+    
     def update_job_insights(self, job_id, skills, exp_level):
         """Update job with extracted insights"""
         pass
@@ -1,114 +1,215 @@
 from database import Database
-import json
+from psycopg2.extras import RealDictCursor
+import orjson
 from collections import Counter
+import numpy as np
 import pandas as pd
 
+# Columns score_row/score_frame read by name (plus company_job_count;
+# score_frame rows also carry skill_matches). description/requirements are
+# large and never scored, so they are not fetched.
+JOB_FIELDS = [
+    'job_id', 'title', 'company', 'location',
+    'salary_min', 'salary_max', 'extracted_skills',
+    'experience_level', 'source', 'url'
+]
+JOB_COLUMNS = ', '.join(JOB_FIELDS)
+
+DEFAULT_PREFERENCES = {
+    'min_salary': 80000,
+    'preferred_location': 'Remote',
+    'required_skills': [],
+    'nice_to_have_skills': [],
+    'experience_level': 'Senior'
+}
+
+# Weight of each sub-score in the total
+SCORE_WEIGHTS = {
+    'skill_match': 0.40,
+    'salary': 0.25,
+    'location': 0.15,
+    'experience': 0.10,
+    'company_growth': 0.10
+}
+
+EXP_LEVELS = ['Junior', 'Mid-Level', 'Senior']
+
 class OpportunityScorer:
     def __init__(self):
         self.db = Database()
     
     def score_job(self, job_id, user_skills, preferences=None):
         """Score a job opportunity based on multiple factors"""
-        if preferences is None:
-            preferences = {
-                'min_salary': 80000,
-                'preferred_location': 'Remote',
-                'required_skills': [],
-                'nice_to_have_skills': [],
-                'experience_level': 'Senior'
-            }
-        
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        # Get job details
-        cursor.execute("""
-            SELECT 
-                job_id, title, company, location, 
-                salary_min, salary_max, extracted_skills,
-                experience_level, requirements, description,
-                source, url
-            FROM jobs 
-            WHERE id = %s
-        """, (job_id,))
-        
-        job = cursor.fetchone()
+        # Get job details plus the company's active posting count
+        with self.db.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {JOB_COLUMNS},
+                    (SELECT COUNT(*) FROM jobs c 
+                     WHERE c.company = jobs.company AND c.is_active = TRUE) as company_job_count
+                FROM jobs 
+                WHERE id = %s
+            """, (job_id,))
+            
+            job = cursor.fetchone()
         
         if not job:
             return None
         
-        cursor.close()
-        self.db.return_connection(conn)
+        return self.score_row(job, self.skill_set(user_skills), preferences)
+    
+    def score_row(self, job, user_set, preferences=None):
+        """Score an already-fetched job row dict (JOB_COLUMNS + company_job_count), no DB access.
         
-        # Unpack job data
-        (job_uid, title, company, location, salary_min, salary_max, 
-         extracted_skills_json, exp_level, requirements, description,
-         source, url) = job
+        `user_set` is the normalized skill set from skill_set().
+        """
+        if preferences is None:
+            preferences = DEFAULT_PREFERENCES
         
-        # Parse skills
-        job_skills = []
-        if extracted_skills_json:
-            try:
-                job_skills = json.loads(extracted_skills_json)
-            except:
-                pass
+        job_skills = self.parse_skills(job['extracted_skills'])
         
         # Calculate scores (0-100 for each category)
         scores = {}
         
         # 1. Skill Match Score (40% weight)
-        scores['skill_match'] = self.calculate_skill_match(user_skills, job_skills)
+        scores['skill_match'] = self.calculate_skill_match(user_set, frozenset(job_skills))
         
         # 2. Salary Score (25% weight)
         scores['salary'] = self.calculate_salary_score(
-            salary_min, salary_max, preferences['min_salary']
+            job['salary_min'], job['salary_max'], preferences['min_salary']
         )
         
         # 3. Location Score (15% weight)
         scores['location'] = self.calculate_location_score(
-            location, preferences['preferred_location']
+            job['location'], preferences['preferred_location']
         )
         
         # 4. Experience Level Match (10% weight)
         scores['experience'] = self.calculate_experience_score(
-            exp_level, preferences['experience_level']
+            job['experience_level'], preferences['experience_level']
         )
         
         # 5. Company Growth Score (10% weight)
-        scores['company_growth'] = self.calculate_company_score(company)
+        scores['company_growth'] = self.calculate_company_score(job['company_job_count'])
         
         # Calculate weighted total
-        weights = {
-            'skill_match': 0.40,
-            'salary': 0.25,
-            'location': 0.15,
-            'experience': 0.10,
-            'company_growth': 0.10
-        }
+        total_score = sum(scores[key] * SCORE_WEIGHTS[key] for key in scores)
         
-        total_score = sum(scores[key] * weights[key] for key in scores)
+        return self.build_result(job, job_skills, user_set, scores, total_score)
+    
+    def score_frame(self, jobs, user_set, preferences=None):
+        """Score many fetched job row dicts at once with vector ops (same rules as score_row).
+        
+        Rows carry a trailing skill_matches column: the number of the user's
+        skills the job lists, computed by Postgres. Returns a DataFrame with one
+        column per sub-score, 'total', and 'job_skills'.
+        """
+        if preferences is None:
+            preferences = DEFAULT_PREFERENCES
+        
+        df = pd.DataFrame.from_records(
+            jobs, columns=JOB_FIELDS + ['company_job_count', 'skill_matches'], coerce_float=True
+        )
+        scores = pd.DataFrame(index=df.index)
+        
+        # 1. Skill match: share of the job's skills the user has, +10 bonus for full coverage
+        scores['job_skills'] = df['extracted_skills'].map(self.parse_skills)
+        required = scores['job_skills'].map(len).to_numpy()
+        matching = df['skill_matches'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            match_pct = matching / required * 100
+        match_pct = np.where(matching >= required, np.minimum(100, match_pct + 10), match_pct)
+        scores['skill_match'] = np.where(required == 0, 50, np.round(match_pct, 1))
+        
+        # 2. Salary buckets relative to the desired minimum (unknown = neutral)
+        salary_min = df['salary_min'].astype(float)
+        salary_max = df['salary_max'].astype(float)
+        avg_salary = ((salary_min + salary_max) / 2).to_numpy()
+        desired = preferences['min_salary']
+        known = (salary_min.fillna(0) != 0) & (salary_max.fillna(0) != 0)
+        scores['salary'] = np.where(known, np.select(
+            [avg_salary >= desired * 1.5, avg_salary >= desired * 1.2,
+             avg_salary >= desired, avg_salary >= desired * 0.8],
+            [100, 85, 70, 50],
+            default=30
+        ), 50)
+        
+        # 3. Location match
+        job_loc = df['location'].fillna('').str.lower()
+        pref_loc = preferences['preferred_location'].lower()
+        job_remote = job_loc.str.contains('remote', regex=False)
+        close_match = job_loc.str.contains(pref_loc, regex=False) | job_loc.map(lambda loc: loc in pref_loc)
+        scores['location'] = np.select(
+            [job_loc == '', job_remote & ('remote' in pref_loc), close_match, job_remote],
+            [50, 100, 90, 80],
+            default=40
+        )
+        
+        # 4. Experience level distance (unknown levels = flexible)
+        if preferences['experience_level'] in EXP_LEVELS:
+            user_idx = EXP_LEVELS.index(preferences['experience_level'])
+            job_idx = df['experience_level'].map({level: i for i, level in enumerate(EXP_LEVELS)})
+            distance = (job_idx - user_idx).abs()
+            scores['experience'] = np.select([distance == 0, distance == 1, distance == 2], [100, 70, 40], default=70)
+        else:
+            scores['experience'] = 70
+        
+        # 5. Company hiring velocity
+        company_jobs = df['company_job_count']
+        scores['company_growth'] = np.select(
+            [company_jobs >= 5, company_jobs >= 3, company_jobs >= 2],
+            [90, 75, 60],
+            default=50
+        )
+        
+        # Weighted total as one matrix-vector product
+        scores['total'] = scores[list(SCORE_WEIGHTS)].to_numpy(dtype=float) @ np.array(list(SCORE_WEIGHTS.values()))
+        
+        return scores
+    
+    def build_result(self, job, job_skills, user_set, scores, total_score):
+        """Assemble the score dict for one job row"""
+        salary_min, salary_max = job['salary_min'], job['salary_max']
         
         return {
-            'job_id': job_uid,
-            'title': title,
-            'company': company,
-            'location': location,
+            'job_id': job['job_id'],
+            'title': job['title'],
+            'company': job['company'],
+            'location': job['location'],
             'salary_range': f"${salary_min:,.0f} - ${salary_max:,.0f}" if salary_min else "Not disclosed",
             'total_score': round(total_score, 1),
             'breakdown': scores,
-            'matching_skills': [s for s in user_skills if s in job_skills],
-            'missing_skills': [s for s in job_skills if s not in user_skills],
-            'url': url,
+            'matching_skills': [s for s in job_skills if s in user_set],
+            'missing_skills': [s for s in job_skills if s not in user_set],
+            'url': job['url'],
             'recommendation': self.get_recommendation(total_score)
         }
     
-    def calculate_skill_match(self, user_skills, job_skills):
-        """Calculate skill match percentage"""
-        if not job_skills:
+    def skill_set(self, user_skills):
+        """Normalize user skills once into a set for O(1) membership tests.
+        
+        Stored job skills are lowercase, so 'Python ' must become 'python'
+        to match; blank entries are dropped.
+        """
+        return frozenset(s.strip().lower() for s in user_skills if s and s.strip())
+    
+    def parse_skills(self, extracted_skills):
+        """Stored skills as a list (TEXT[] arrives as a list; legacy JSON text is parsed)"""
+        if not extracted_skills:
+            return []
+        if isinstance(extracted_skills, str):
+            try:
+                return orjson.loads(extracted_skills)
+            except orjson.JSONDecodeError:
+                return []
+        return extracted_skills
+    
+    def calculate_skill_match(self, user_set, job_set):
+        """Calculate skill match percentage (both arguments are already-normalized sets)"""
+        if not job_set:
             return 50  # Neutral if no skills listed
         
-        matching = len([s for s in user_skills if s in job_skills])
-        total_required = len(job_skills)
+        matching = len(user_set & job_set)
+        total_required = len(job_set)
         
         if total_required == 0:
             return 50
@@ -161,11 +262,9 @@ class OpportunityScorer:
         if not job_exp_level or job_exp_level == 'Not specified':
             return 70  # Flexible
         
-        exp_levels = ['Junior', 'Mid-Level', 'Senior']
-        
         try:
-            job_idx = exp_levels.index(job_exp_level)
-            user_idx = exp_levels.index(user_exp_level)
+            job_idx = EXP_LEVELS.index(job_exp_level)
+            user_idx = EXP_LEVELS.index(user_exp_level)
             
             if job_idx == user_idx:
                 return 100  # Perfect match
@@ -176,23 +275,8 @@ class OpportunityScorer:
         except ValueError:
             return 70  # Can't determine
     
-    def calculate_company_score(self, company):
-        """Score based on company hiring velocity"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        # How many jobs does this company have?
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM jobs 
-            WHERE company = %s AND is_active = TRUE
-        """, (company,))
-        
-        job_count = cursor.fetchone()[0]
-        
-        cursor.close()
-        self.db.return_connection(conn)
-        
+    def calculate_company_score(self, job_count):
+        """Score based on company hiring velocity (number of active postings)"""
         # More jobs = growing company
         if job_count >= 5:
             return 90   # Rapidly hiring
@@ -220,24 +304,34 @@ class OpportunityScorer:
         print("🎯 JOB OPPORTUNITY RANKING")
         print("=" * 60)
         
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id FROM jobs WHERE is_active = TRUE")
-        job_ids = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        self.db.return_connection(conn)
-        
-        print(f"\n📊 Analyzing {len(job_ids)} opportunities...")
-        print(f"👤 Your skills: {', '.join(user_skills)}\n")
-        
-        # Score all jobs
+        user_set = self.skill_set(user_skills)
+        
+        # Every active job with its company's posting count and the number of
+        # the user's skills it lists, in one query
+        with self.db.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {JOB_COLUMNS},
+                    COUNT(company) OVER (PARTITION BY company) as company_job_count,
+                    cardinality(ARRAY(
+                        SELECT unnest(extracted_skills) 
+                        INTERSECT SELECT unnest(%s::text[])
+                    )) as skill_matches
+                FROM jobs 
+                WHERE is_active = TRUE
+            """, (list(user_set),))
+            jobs = cursor.fetchall()
+        
+        print(f"\n📊 Analyzing {len(jobs)} opportunities...")
+        print(f"👤 Your skills: {', '.join(sorted(user_set))}\n")
+        
+        # Score all jobs as vector ops, then build result dicts
         scored_jobs = []
-        for job_id in job_ids:
-            score_data = self.score_job(job_id, user_skills, preferences)
-            if score_data:
-                scored_jobs.append(score_data)
+        if jobs:
+            scores = self.score_frame(jobs, user_set, preferences)
+            breakdowns = scores[list(SCORE_WEIGHTS)].to_dict('records')
+            for job, job_skills, breakdown, total_score in zip(
+                    jobs, scores['job_skills'], breakdowns, scores['total'].tolist()):
+                scored_jobs.append(self.build_result(job, job_skills, user_set, breakdown, total_score))
         
         # Sort by score
         scored_jobs.sort(key=lambda x: x['total_score'], reverse=True)
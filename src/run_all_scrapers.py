@@ -1,6 +1,7 @@
 import sys
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scrapers.remoteok_scraper import RemoteOKScraper
@@ -24,24 +25,25 @@ class MasterScraper:
         initial_count = self.get_job_count()
         print(f"📊 Current database: {initial_count} jobs\n")
         
-        # Run RemoteOK
-        print("🔹 Source 1: RemoteOK")
+        # Sources are independent, I/O-bound HTTP APIs: scrape them side by side
+        # (each scraper saves through its own connection pool)
+        scrapers = {
+            'RemoteOK': RemoteOKScraper(),
+            'Remotive': GitHubJobsScraper()
+        }
+        print(f"🔹 Sources: {', '.join(scrapers)} (running in parallel)")
         print("-" * 60)
-        remoteok = RemoteOKScraper()
-        remoteok_count = remoteok.scrape(max_jobs=50)
-        self.sources_stats['RemoteOK'] = remoteok_count
+        with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+            futures = {
+                source: executor.submit(scraper.scrape, max_jobs=50)
+                for source, scraper in scrapers.items()
+            }
+            for source, future in futures.items():
+                self.sources_stats[source] = future.result()
         print()
         
-        # Run Remotive
-        print("🔹 Source 2: Remotive")
-        print("-" * 60)
-        remotive = GitHubJobsScraper()
-        remotive_count = remotive.scrape(max_jobs=50)
-        self.sources_stats['Remotive'] = remotive_count
-        print()
-        
-        # Final stats
-        final_count = self.get_job_count()
+        # Final stats (count and latest jobs in one query)
+        final_count, latest_jobs = self.get_count_and_latest()
         new_jobs = final_count - initial_count
         
         print("=" * 60)
@@ -57,7 +59,7 @@ class MasterScraper:
         print(f"\n⏰ Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         
-        self.show_sample_jobs()
+        self.show_sample_jobs(latest_jobs)
     
     def get_job_count(self):
         """Get total job count from database"""
@@ -69,27 +71,32 @@ class MasterScraper:
         self.db.return_connection(conn)
         return count
     
-    def show_sample_jobs(self):
+    def get_count_and_latest(self, limit=10):
+        """Get total job count and the latest jobs in a single round-trip"""
+        with self.db.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM jobs) as total,
+                       title, company, location, source, scraped_at 
+                FROM jobs 
+                ORDER BY scraped_at DESC 
+                LIMIT %s
+            """, (limit,))
+            rows = cursor.fetchall()
+        
+        total = rows[0][0] if rows else 0
+        return total, [row[1:] for row in rows]
+    
+    def show_sample_jobs(self, latest_jobs=None):
         """Show sample of latest jobs"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        if latest_jobs is None:
+            _, latest_jobs = self.get_count_and_latest()
         
         print("\n🎯 Latest 10 Jobs:")
         print("-" * 60)
         
-        cursor.execute("""
-            SELECT title, company, location, source, scraped_at 
-            FROM jobs 
-            ORDER BY scraped_at DESC 
-            LIMIT 10
-        """)
-        
-        for idx, row in enumerate(cursor.fetchall(), 1):
+        for idx, row in enumerate(latest_jobs, 1):
             title, company, location, source, scraped_at = row
             print(f"{idx:2d}. {title[:40]:40s} | {company[:20]:20s} | {source}")
-        
-        cursor.close()
-        self.db.return_connection(conn)
 
 if __name__ == "__main__":
     master = MasterScraper()
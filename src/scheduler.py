@@ -1,7 +1,10 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import signal
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -21,6 +24,7 @@ class JobScheduler:
             'last_run': None,
             'next_run': None
         }
+        self._stop = threading.Event()
     
     def scrape_all_sources(self):
         """Main scraping job - runs on schedule"""
@@ -33,19 +37,14 @@ class JobScheduler:
         self.stats['last_run'] = datetime.now()
         
         try:
-            total_scraped = 0
-            
-            # RemoteOK
-            print("\n📡 Scraping RemoteOK...")
-            remoteok = RemoteOKScraper()
-            count1 = remoteok.scrape(max_jobs=30)
-            total_scraped += count1
-            
-            # Remotive
-            print("\n📡 Scraping Remotive...")
-            remotive = GitHubJobsScraper()
-            count2 = remotive.scrape(max_jobs=30)
-            total_scraped += count2
+            # RemoteOK and Remotive are independent hosts and the scrapers are
+            # I/O-bound, so fetch both at once
+            print("\n📡 Scraping RemoteOK and Remotive...")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                remoteok = executor.submit(RemoteOKScraper().scrape, max_jobs=30)
+                remotive = executor.submit(GitHubJobsScraper().scrape, max_jobs=30)
+                count1, count2 = remoteok.result(), remotive.result()
+            total_scraped = count1 + count2
             
             print("\n" + "=" * 60)
             print(f"✅ SCRAPE COMPLETE!")
@@ -114,28 +113,41 @@ class JobScheduler:
         print("🚀 Running initial scrape...")
         self.scrape_all_sources()
         
+        # Status only changes when a run finishes, so redraw it then
+        # instead of polling
+        self.scheduler.add_listener(self.show_status, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+        
         # Start scheduler
         self.scheduler.start()
+        self.show_status()
         
-        # Keep running
+        # Sleep until Ctrl+C / SIGTERM sets the stop event. The wait is bounded
+        # because an untimed wait can't be interrupted on Windows, so the
+        # signal handler would never run there
+        signal.signal(signal.SIGINT, lambda *_: self._stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
         try:
-            while True:
-                # Show next run time
-                next_run = self.scheduler.get_job('scrape_jobs').next_run_time
-                self.stats['next_run'] = next_run
-                
-                print(f"\r⏳ Next scrape: {next_run.strftime('%Y-%m-%d %H:%M:%S')} | "
-                      f"Runs: {self.stats['total_runs']} | "
-                      f"Success: {self.stats['successful_runs']} | "
-                      f"Failed: {self.stats['failed_runs']}", end='', flush=True)
-                
-                time.sleep(30)  # Update display every 30 seconds
-                
-        except (KeyboardInterrupt, SystemExit):
+            while not self._stop.wait(30):
+                pass
+        finally:
             print("\n\n🛑 Shutting down scheduler...")
             self.scheduler.shutdown()
             print("✅ Scheduler stopped")
     
+    def show_status(self, event=None):
+        """Show next run time and run counts on one line"""
+        job = self.scheduler.get_job('scrape_jobs')
+        if job is None:
+            return
+        
+        next_run = job.next_run_time
+        self.stats['next_run'] = next_run
+        
+        print(f"\r⏳ Next scrape: {next_run.strftime('%Y-%m-%d %H:%M:%S')} | "
+              f"Runs: {self.stats['total_runs']} | "
+              f"Success: {self.stats['successful_runs']} | "
+              f"Failed: {self.stats['failed_runs']}", end='', flush=True)
+    
     def get_logs(self, limit=10):
         """Get recent scraping logs"""
         conn = self.db.get_connection()
@@ -1,15 +1,38 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import orjson
+import hashlib
+import os
 import time
 from datetime import datetime
 import random
 
+# ETag / Last-Modified of the last fully processed API response, per cache key
+HTTP_CACHE_DIR = 'data/http_cache'
+
+def make_session():
+    """requests.Session with pooled keep-alive connections and retries on transient errors"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Shared by every scraper so repeated fetches reuse open connections
+SESSION = make_session()
+
 class BaseScraper:
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.session = requests.Session()
+        self.session = SESSION
     
     def respectful_request(self, url, delay=2):
         """Makes request with delay to be respectful"""
@@ -22,6 +45,48 @@ class BaseScraper:
             print(f"❌ Error fetching {url}: {e}")
             return None
     
+    def conditional_get(self, url, cache_key, timeout=15):
+        """GET url, sending the validators remembered for cache_key.
+        
+        A 304 response means nothing changed since the last remember_response().
+        """
+        headers = dict(self.headers)
+        validators = self._read_validators(cache_key)
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        return self.session.get(url, headers=headers, timeout=timeout)
+    
+    def remember_response(self, cache_key, response):
+        """Store a processed response's validators for the next conditional_get"""
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if not any(validators.values()):
+            return
+        
+        try:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            with open(self._validators_path(cache_key), 'wb') as f:
+                f.write(orjson.dumps(validators))
+        except OSError as e:
+            print(f"⚠️  Could not cache response validators: {e}")
+    
+    def _validators_path(self, cache_key):
+        """Validator file for a cache key"""
+        return os.path.join(HTTP_CACHE_DIR, hashlib.sha256(cache_key.encode()).hexdigest() + '.json')
+    
+    def _read_validators(self, cache_key):
+        """Validators stored for cache_key, or {} if none"""
+        try:
+            with open(self._validators_path(cache_key), 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+    
     def parse_jobs(self, html):
         """Override this in specific scrapers"""
         raise NotImplementedError("Subclass must implement parse_jobs()")
@@ -1,15 +1,15 @@
-import requests
+import orjson
 from datetime import datetime
-import time
-import random
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import Database
+from scraper_base import BaseScraper
 
-class RemoteOKScraper:
+class RemoteOKScraper(BaseScraper):
     def __init__(self):
+        super().__init__()
         self.api_url = "https://remoteok.com/api"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -24,13 +24,15 @@ class RemoteOKScraper:
         print(f"📊 Target: {max_jobs} jobs")
         
         try:
-            # Be respectful - wait before requesting
-            time.sleep(2)
-            
-            response = requests.get(self.api_url, headers=self.headers, timeout=15)
+            # Skip download and parsing when the feed hasn't changed since the last saved run
+            cache_key = f"{self.api_url}#{max_jobs}"
+            response = self.conditional_get(self.api_url, cache_key, timeout=15)
+            if response.status_code == 304:
+                print(f"✅ No changes since last scrape (304 Not Modified)")
+                return self.jobs_scraped
             response.raise_for_status()
             
-            jobs_data = response.json()
+            jobs_data = orjson.loads(response.content)
             
             # First item is metadata, skip it
             jobs = jobs_data[1:max_jobs+1]
@@ -38,22 +40,31 @@ class RemoteOKScraper:
             print(f"✅ Retrieved {len(jobs)} jobs from API")
             print(f"🔍 Processing jobs...\n")
             
+            # Progress every 10 jobs rather than two lines per job
+            parsed = []
             for idx, job in enumerate(jobs, 1):
                 try:
-                    print(f"  [{idx}] Processing: {job.get('position', 'N/A')[:50]}...")
-                    
                     job_data = self.parse_job(job)
                     
                     if job_data:
-                        self.save_job(job_data)
-                        self.jobs_scraped += 1
-                        print(f"      ✓ Saved: {job_data['title'][:50]} at {job_data['company']}")
-                    
-                    time.sleep(random.uniform(0.1, 0.3))
+                        parsed.append(job_data)
                     
                 except Exception as e:
-                    print(f"      ❌ Error: {e}")
+                    print(f"  [{idx}] ❌ Error: {e}")
                     continue
+                
+                if idx % 10 == 0:
+                    print(f"   Processed {idx}/{len(jobs)} jobs...")
+            
+            print(f"✓ Parsed {len(parsed)}/{len(jobs)} jobs")
+            
+            # One batched upsert instead of a round-trip per job
+            saved = self.save_jobs(parsed)
+            self.jobs_scraped += saved
+            
+            # Only a response that made it into the database may be skipped next time
+            if saved or not parsed:
+                self.remember_response(cache_key, response)
             
             print(f"\n🎉 Scraping complete! Total jobs saved: {self.jobs_scraped}")
             return self.jobs_scraped
@@ -145,47 +156,13 @@ class RemoteOKScraper:
             traceback.print_exc()
             return None
     
+    def save_jobs(self, jobs):
+        """Save parsed jobs to database in one batch"""
+        return self.db.bulk_upsert_jobs(jobs)
+    
     def save_job(self, job_data):
         """Save job to database"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO jobs (job_id, title, company, location, salary_min, salary_max, 
-                                description, requirements, url, source, posted_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (job_id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    company = EXCLUDED.company,
-                    location = EXCLUDED.location,
-                    salary_min = EXCLUDED.salary_min,
-                    salary_max = EXCLUDED.salary_max,
-                    description = EXCLUDED.description,
-                    requirements = EXCLUDED.requirements,
-                    scraped_at = CURRENT_TIMESTAMP
-            """, (
-                job_data['job_id'],
-                job_data['title'],
-                job_data['company'],
-                job_data['location'],
-                job_data['salary_min'],
-                job_data['salary_max'],
-                job_data['description'],
-                job_data['requirements'],
-                job_data['url'],
-                job_data['source'],
-                job_data['posted_date']
-            ))
-            
-            conn.commit()
-            
-        except Exception as e:
-            print(f"        ❌ Database save error: {e}")
-            conn.rollback()
-        finally:
-            cursor.close()
-            self.db.return_connection(conn)
+        self.save_jobs([job_data])
 
 if __name__ == "__main__":
     scraper = RemoteOKScraper()
@@ -1,13 +1,118 @@
 from database import Database
-import pandas as pd
+from ttl_cache import TTLCache
 from datetime import datetime, timedelta
-from collections import Counter
-import json
+from functools import wraps
+from contextlib import redirect_stdout
+import numpy as np
+import hashlib
+import pickle
+import time
+import sys
+import io
+import os
+
+# Rendered analysis output, replayed while the jobs table is unchanged; the TTL
+# bounds drift in the NOW()-relative time windows
+TREND_CACHE_DIR = 'data/trend_cache'
+TREND_CACHE_TTL = 10 * 60
+
+# The table fingerprint is looked up at most once per TTL, so a cache hit needs no query
+_VERSION_CACHE = TTLCache(maxsize=1, ttl=TREND_CACHE_TTL)
+
+def growth_rates(recent, older):
+    """Percent change from older to recent counts (100 for new skills, 0 if never seen)"""
+    return np.where(older > 0, (recent - older) / np.maximum(older, 1) * 100,
+                    np.where(recent > 0, 100.0, 0.0))
+
+def top_indices(keys, k):
+    """Indices of the k largest keys, largest first (ties in index order).
+    
+    np.partition finds the k-th largest key in linear time, so only the keys
+    at or above it are sorted.
+    """
+    if len(keys) > k:
+        cutoff = np.partition(keys, len(keys) - k)[len(keys) - k]
+        candidates = np.flatnonzero(keys >= cutoff)
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.argsort(-keys[candidates], kind='stable')][:k]
+
+def cached_report(method):
+    """Serve a report method's printed output and return value from disk.
+    
+    The cache key covers the method, its arguments and the jobs table's
+    data_version(), so a scrape or skill extraction starts a fresh run once
+    the cached fingerprint expires.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = repr((method.__qualname__, args, sorted(kwargs.items()), self.data_version()))
+        path = os.path.join(TREND_CACHE_DIR, f"{hashlib.sha256(key.encode()).hexdigest()}.pkl")
+        
+        cached = self._read_cache(path)
+        if cached is not None:
+            output, result = cached
+            print(output, end='')
+            return result
+        
+        buffer = io.StringIO()
+        try:
+            with redirect_stdout(buffer):
+                result = method(self, *args, **kwargs)
+        finally:
+            print(buffer.getvalue(), end='')
+        
+        self._write_cache(path, (buffer.getvalue(), result))
+        return result
+    
+    return wrapper
 
 class TrendAnalyzer:
     def __init__(self):
         self.db = Database()
     
+    def data_version(self):
+        """Fingerprint of the jobs table that changes whenever its analyses would"""
+        version = _VERSION_CACHE.get('jobs')
+        if version is not None:
+            return version
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT MAX(scraped_at), COUNT(*),
+                   COUNT(*) FILTER (WHERE is_active), COUNT(extracted_skills)
+            FROM jobs
+        """)
+        version = cursor.fetchone()
+        
+        cursor.close()
+        self.db.return_connection(conn)
+        
+        _VERSION_CACHE.set('jobs', version)
+        return version
+    
+    def _read_cache(self, path):
+        """Return a cached (output, result) pair if present and not expired"""
+        try:
+            if time.time() - os.path.getmtime(path) > TREND_CACHE_TTL:
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+    
+    def _write_cache(self, path, entry):
+        """Store a rendered report"""
+        try:
+            os.makedirs(TREND_CACHE_DIR, exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(entry, f)
+        except OSError as e:
+            print(f"⚠️  Could not cache report: {e}")
+    
+    @cached_report
     def analyze_skill_trends(self, days_back=30):
         """Analyze skill demand trends over time"""
         print("=" * 60)
@@ -15,122 +120,124 @@ class TrendAnalyzer:
         print("=" * 60)
         
         conn = self.db.get_connection()
+        cursor = conn.cursor()
         
-        # Get jobs from different time periods
-        query = """
+        # Summary of the time window, including the median scrape time that
+        # splits it into earlier/recent halves (percentile_cont interpolates like pandas' median)
+        cursor.execute("""
+            WITH scoped AS (
+                SELECT scraped_at
+                FROM jobs 
+                WHERE is_active = TRUE 
+                AND extracted_skills IS NOT NULL
+                AND scraped_at >= NOW() - INTERVAL '1 day' * %s
+            )
             SELECT 
-                extracted_skills,
-                scraped_at,
-                DATE(scraped_at) as scrape_date
-            FROM jobs 
-            WHERE is_active = TRUE 
-            AND extracted_skills IS NOT NULL
-            AND scraped_at >= NOW() - INTERVAL '%s days'
-            ORDER BY scraped_at DESC
-        """
+                COUNT(*),
+                MIN(scraped_at)::date,
+                MAX(scraped_at)::date,
+                COUNT(DISTINCT scraped_at::date),
+                TIMESTAMP 'epoch' + percentile_cont(0.5) 
+                    WITHIN GROUP (ORDER BY scraped_at - TIMESTAMP 'epoch')
+            FROM scoped
+        """, (days_back,))
         
-        df = pd.read_sql(query % days_back, conn)
+        total, first_date, last_date, unique_dates, mid_point = cursor.fetchone()
+        
+        cursor.close()
         self.db.return_connection(conn)
         
-        print(f"\n📊 Analyzing {len(df)} jobs from last {days_back} days")
+        print(f"\n📊 Analyzing {total} jobs from last {days_back} days")
         
-        if len(df) == 0:
+        if total == 0:
             print("⚠️  No data in selected time range")
             return
         
-        # Group by date
-        dates = df['scrape_date'].unique()
-        print(f"   • Date range: {dates.min()} to {dates.max()}")
-        print(f"   • Unique dates: {len(dates)}")
+        print(f"   • Date range: {first_date} to {last_date}")
+        print(f"   • Unique dates: {unique_dates}")
         
         # Analyze skills by time period
-        self.skill_growth_analysis(df)
-        
-        return df
+        self.skill_growth_analysis(days_back, mid_point)
+        
+        return {
+            'total_jobs': total,
+            'first_date': first_date,
+            'last_date': last_date,
+            'unique_dates': unique_dates,
+            'mid_point': mid_point
+        }
     
-    def skill_growth_analysis(self, df):
+    def skill_growth_analysis(self, days_back, mid_point):
         """Detect growing vs declining skills"""
         print(f"\n🔥 SKILL GROWTH ANALYSIS")
         print("-" * 60)
         
-        # Split into recent vs older
-        mid_point = df['scraped_at'].median()
-        
-        recent_jobs = df[df['scraped_at'] >= mid_point]
-        older_jobs = df[df['scraped_at'] < mid_point]
-        
-        print(f"   • Recent period: {len(recent_jobs)} jobs")
-        print(f"   • Earlier period: {len(older_jobs)} jobs")
-        
-        # Extract skills from each period
-        recent_skills = self.extract_all_skills(recent_jobs)
-        older_skills = self.extract_all_skills(older_jobs)
-        
-        # Calculate frequencies
-        recent_freq = Counter(recent_skills)
-        older_freq = Counter(older_skills)
-        
-        # Find all unique skills
-        all_skills = set(list(recent_freq.keys()) + list(older_freq.keys()))
-        
-        # Calculate growth rates
-        growth_data = []
-        for skill in all_skills:
-            recent_count = recent_freq.get(skill, 0)
-            older_count = older_freq.get(skill, 0)
-            
-            if older_count > 0:
-                growth_rate = ((recent_count - older_count) / older_count) * 100
-            else:
-                growth_rate = 100 if recent_count > 0 else 0
-            
-            growth_data.append({
-                'skill': skill,
-                'recent_count': recent_count,
-                'older_count': older_count,
-                'growth_rate': growth_rate,
-                'total_mentions': recent_count + older_count
-            })
-        
-        # Sort by growth rate
-        growth_data.sort(key=lambda x: x['growth_rate'], reverse=True)
-        
-        # Show trending up
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        # Postgres unnests and tallies skills per half; only aggregates come back.
+        # The first row (skill NULL) carries the job count of each half.
+        cursor.execute("""
+            WITH scoped AS (
+                SELECT extracted_skills, scraped_at >= %(mid)s AS is_recent
+                FROM jobs 
+                WHERE is_active = TRUE 
+                AND extracted_skills IS NOT NULL
+                AND scraped_at >= NOW() - INTERVAL '1 day' * %(days)s
+            )
+            SELECT NULL AS skill, COUNT(*) FILTER (WHERE is_recent), COUNT(*) FILTER (WHERE NOT is_recent)
+            FROM scoped
+            UNION ALL
+            SELECT skill, COUNT(*) FILTER (WHERE is_recent), COUNT(*) FILTER (WHERE NOT is_recent)
+            FROM scoped, unnest(extracted_skills) AS skill
+            GROUP BY skill
+            ORDER BY skill NULLS FIRST
+        """, {'mid': mid_point, 'days': days_back})
+        
+        (_, recent_jobs, older_jobs), *skill_counts = cursor.fetchall()
+        
+        cursor.close()
+        self.db.return_connection(conn)
+        
+        print(f"   • Recent period: {recent_jobs} jobs")
+        print(f"   • Earlier period: {older_jobs} jobs")
+        
+        # Calculate growth rates over the whole skill column at once
+        skills = np.array([row[0] for row in skill_counts], dtype=object)
+        recent = np.array([row[1] for row in skill_counts], dtype=np.int64)
+        older = np.array([row[2] for row in skill_counts], dtype=np.int64)
+        
+        growth = growth_rates(recent, older)
+        
+        total = recent + older
+        
+        # Show trending up (only 10 of each list are shown, so they are selected
+        # rather than sorting every skill; ties keep the alphabetical SQL order)
         print(f"\n🚀 TRENDING UP (Fastest Growing):")
-        for item in growth_data[:10]:
-            if item['total_mentions'] >= 2:  # Filter noise
-                print(f"   • {item['skill']:20s} "
-                      f"📈 {item['growth_rate']:+6.1f}% "
-                      f"({item['older_count']} → {item['recent_count']})")
+        for i in top_indices(growth, 10):
+            if total[i] >= 2:  # Filter noise
+                print(f"   • {skills[i]:20s} "
+                      f"📈 {growth[i]:+6.1f}% "
+                      f"({older[i]} → {recent[i]})")
         
         # Show trending down
         print(f"\n📉 TRENDING DOWN:")
-        declining = [x for x in growth_data if x['growth_rate'] < -20 and x['total_mentions'] >= 2]
-        for item in declining[-10:]:
-            print(f"   • {item['skill']:20s} "
-                  f"📉 {item['growth_rate']:+6.1f}% "
-                  f"({item['older_count']} → {item['recent_count']})")
+        # The 10 steepest declines, shown from least to most steep
+        declining = np.flatnonzero((growth < -20) & (total >= 2))[::-1]
+        for i in declining[top_indices(-growth[declining], 10)][::-1]:
+            print(f"   • {skills[i]:20s} "
+                  f"📉 {growth[i]:+6.1f}% "
+                  f"({older[i]} → {recent[i]})")
         
         # Show stable/consistent
         print(f"\n⚖️  CONSISTENTLY IN DEMAND:")
-        stable = [x for x in growth_data if abs(x['growth_rate']) < 20 and x['total_mentions'] >= 5]
-        stable.sort(key=lambda x: x['total_mentions'], reverse=True)
-        for item in stable[:10]:
-            print(f"   • {item['skill']:20s} "
-                  f"Stable: {item['total_mentions']} mentions")
-    
-    def extract_all_skills(self, df):
-        """Extract all skills from jobs"""
-        all_skills = []
-        for skills_json in df['extracted_skills']:
-            if skills_json and skills_json != '[]':
-                try:
-                    skills = json.loads(skills_json)
-                    all_skills.extend(skills)
-                except:
-                    pass
-        return all_skills
+        stable = np.flatnonzero((np.abs(growth) < 20) & (total >= 5))
+        stable = stable[np.lexsort((-growth[stable], -total[stable]))]
+        for i in stable[:10]:
+            print(f"   • {skills[i]:20s} "
+                  f"Stable: {total[i]} mentions")
     
+    @cached_report
     def analyze_company_hiring_patterns(self):
         """Analyze which companies are hiring most"""
         print(f"\n{'=' * 60}")
@@ -160,6 +267,7 @@ class TrendAnalyzer:
         cursor.close()
         self.db.return_connection(conn)
     
+    @cached_report
     def analyze_location_trends(self):
         """Analyze geographic distribution"""
         print(f"\n{'=' * 60}")
@@ -203,21 +311,16 @@ class TrendAnalyzer:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        # Overall stats
-        cursor.execute("SELECT COUNT(*) FROM jobs WHERE is_active = TRUE")
-        total_jobs = cursor.fetchone()[0]
-        
-        cursor.execute("""
-            SELECT COUNT(*) FROM jobs 
-            WHERE is_active = TRUE 
-            AND scraped_at >= NOW() - INTERVAL '24 hours'
-        """)
-        jobs_24h = cursor.fetchone()[0]
-        
+        # Overall stats, all from one scan of the active jobs
         cursor.execute("""
-            SELECT COUNT(DISTINCT company) FROM jobs WHERE is_active = TRUE
+            SELECT 
+                COUNT(*),
+                COUNT(*) FILTER (WHERE scraped_at >= NOW() - INTERVAL '24 hours'),
+                COUNT(DISTINCT company)
+            FROM jobs 
+            WHERE is_active = TRUE
         """)
-        unique_companies = cursor.fetchone()[0]
+        total_jobs, jobs_24h, unique_companies = cursor.fetchone()
         
         print(f"📊 Market Overview:")
         print(f"   • Total active jobs: {total_jobs}")
@@ -225,16 +328,18 @@ class TrendAnalyzer:
         print(f"   • Unique companies: {unique_companies}")
         print(f"   • Data sources: 2 (RemoteOK, Remotive)")
         
-        # Market velocity
+        # Market velocity: one row per day, including days with no jobs; the
+        # half-open range join keeps scraped_at comparable to an index
         cursor.execute("""
             SELECT 
-                DATE(scraped_at) as date,
-                COUNT(*) as count
-            FROM jobs
-            WHERE scraped_at >= NOW() - INTERVAL '7 days'
-            GROUP BY DATE(scraped_at)
-            ORDER BY date DESC
-            LIMIT 7
+                day::date as date,
+                COUNT(j.id) as count
+            FROM generate_series((CURRENT_DATE - 6)::timestamp, CURRENT_DATE::timestamp,
+                                 INTERVAL '1 day') AS day
+            LEFT JOIN jobs j
+                ON j.scraped_at >= day AND j.scraped_at < day + INTERVAL '1 day'
+            GROUP BY day
+            ORDER BY day DESC
         """)
         
         print(f"\n📈 7-Day Activity:")
@@ -245,6 +350,9 @@ class TrendAnalyzer:
         self.db.return_connection(conn)
 
 if __name__ == "__main__":
+    # Block-buffer the reports instead of flushing the terminal after every line
+    sys.stdout.reconfigure(line_buffering=False)
+    
     analyzer = TrendAnalyzer()
     
     # Run all analyses
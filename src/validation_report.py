@@ -1,12 +1,33 @@
 import pandas as pd
+import numpy as np
 from database import Database
+from collections import defaultdict
 from datetime import datetime
 import json
+import re
+
+# Rows pulled from the server-side cursor per validation pass
+CHUNK_SIZE = 10000
+
+# Compiled once; str.match reuses the compiled pattern for every chunk
+URL_RE = re.compile(r'https?://\S+')
 
 class ValidationReport:
     def __init__(self):
         self.db = Database()
         self.issues = []
+        
+        # Running totals, updated one chunk at a time
+        self.total_rows = 0
+        self.columns = []
+        self.null_counts = defaultdict(int)
+        self.non_numeric = set()
+        self.invalid_dates = False
+        self.invalid_salaries = 0
+        self.salary_mins = []
+        self.invalid_urls = 0
+        self.short_descriptions = 0
+        self.long_requirements = 0
     
     def generate_report(self):
         """Generate comprehensive validation report"""
@@ -16,15 +37,25 @@ class ValidationReport:
         print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
         conn = self.db.get_connection()
-        df = pd.read_sql("SELECT * FROM jobs WHERE is_active = TRUE", conn)
-        self.db.return_connection(conn)
+        
+        # Server-side cursor: each chunk is validated and dropped, so only
+        # the counters above stay in memory
+        cursor = conn.cursor(name='validation_scan')
+        try:
+            cursor.execute("SELECT * FROM jobs WHERE is_active = TRUE")
+            for chunk in self._fetch_chunks(cursor):
+                self.update(chunk)
+        finally:
+            cursor.close()
+            conn.rollback()
+            self.db.return_connection(conn)
         
         # Run all validation checks
-        self.check_completeness(df)
-        self.check_data_types(df)
-        self.check_salary_consistency(df)
-        self.check_url_validity(df)
-        self.check_text_quality(df)
+        self.check_completeness()
+        self.check_data_types()
+        self.check_salary_consistency()
+        self.check_url_validity()
+        self.check_text_quality()
         
         # Summary
         self.print_summary()
@@ -32,14 +63,65 @@ class ValidationReport:
         # Save report
         self.save_report()
     
-    def check_completeness(self, df):
+    def _fetch_chunks(self, cursor):
+        """Yield DataFrames of up to CHUNK_SIZE rows from cursor"""
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                return
+            columns = [col[0] for col in cursor.description]
+            # coerce_float turns DECIMAL salaries into floats, as read_sql does
+            yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    
+    def update(self, chunk):
+        """Fold one chunk of jobs into the running totals"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        
+        # An all-NULL chunk comes back as object dtype, so only chunks with values count
+        for col in ('salary_min', 'salary_max'):
+            if chunk[col].notna().any() and chunk[col].dtype not in ['float64', 'int64']:
+                self.non_numeric.add(col)
+        
+        self.total_rows += len(chunk)
+        
+        for col, null_count in chunk.isnull().sum().items():
+            self.null_counts[col] += int(null_count)
+        
+        try:
+            pd.to_datetime(chunk['posted_date'])
+        except:
+            self.invalid_dates = True
+        
+        # Masks over the raw arrays; no intermediate DataFrames
+        salary_min = chunk['salary_min'].to_numpy(dtype=float, na_value=np.nan)
+        salary_max = chunk['salary_max'].to_numpy(dtype=float, na_value=np.nan)
+        has_salary = ~(np.isnan(salary_min) | np.isnan(salary_max))
+        self.invalid_salaries += int(np.count_nonzero(has_salary & (salary_min > salary_max)))
+        # Outliers are relative to the overall average, so keep the values until the end
+        self.salary_mins.append(salary_min[has_salary])
+        
+        urls = chunk['url']
+        valid_urls = urls.str.match(URL_RE, na=False)
+        self.invalid_urls += int((~valid_urls & urls.notna()).sum())
+        
+        # One length pass per text column; missing text is NaN and matches neither threshold
+        if 'description' in chunk.columns:
+            lengths = chunk['description'].str.len().to_numpy(dtype=float, na_value=np.nan)
+            self.short_descriptions += int(np.count_nonzero(lengths < 50))
+        
+        if 'requirements' in chunk.columns:
+            lengths = chunk['requirements'].str.len().to_numpy(dtype=float, na_value=np.nan)
+            self.long_requirements += int(np.count_nonzero(lengths > 1000))
+    
+    def check_completeness(self):
         """Check for missing or invalid data"""
         print("📋 COMPLETENESS CHECK")
         print("-" * 60)
         
-        for col in df.columns:
-            null_count = df[col].isnull().sum()
-            null_pct = (null_count / len(df)) * 100
+        for col in self.columns:
+            null_count = self.null_counts[col]
+            null_pct = (null_count / self.total_rows) * 100
             
             if null_pct > 0:
                 print(f"   • {col}: {null_count} missing ({null_pct:.1f}%)")
@@ -48,95 +130,80 @@ class ValidationReport:
         
         print()
     
-    def check_data_types(self, df):
+    def check_data_types(self):
         """Validate data types"""
         print("🔤 DATA TYPE CHECK")
         print("-" * 60)
         
         # Check salary fields are numeric
-        if df['salary_min'].dtype not in ['float64', 'int64']:
+        if 'salary_min' in self.non_numeric:
             self.issues.append("salary_min is not numeric")
             print("   ⚠️  salary_min is not numeric")
         
-        if df['salary_max'].dtype not in ['float64', 'int64']:
+        if 'salary_max' in self.non_numeric:
             self.issues.append("salary_max is not numeric")
             print("   ⚠️  salary_max is not numeric")
         
         # Check dates
-        try:
-            pd.to_datetime(df['posted_date'])
+        if not self.invalid_dates:
             print("   ✅ posted_date format valid")
-        except:
+        else:
             self.issues.append("Invalid posted_date format")
             print("   ⚠️  posted_date format invalid")
         
         print()
     
-    def check_salary_consistency(self, df):
+    def check_salary_consistency(self):
         """Check salary logic"""
         print("💰 SALARY CONSISTENCY CHECK")
         print("-" * 60)
         
-        salary_df = df[df['salary_min'].notna() & df['salary_max'].notna()]
+        salary_mins = np.concatenate(self.salary_mins) if self.salary_mins else np.empty(0)
         
-        if len(salary_df) > 0:
+        if len(salary_mins) > 0:
             # Check if min > max
-            invalid = salary_df[salary_df['salary_min'] > salary_df['salary_max']]
-            
-            if len(invalid) > 0:
-                print(f"   ⚠️  {len(invalid)} jobs have min salary > max salary")
-                self.issues.append(f"{len(invalid)} jobs with invalid salary range")
+            if self.invalid_salaries > 0:
+                print(f"   ⚠️  {self.invalid_salaries} jobs have min salary > max salary")
+                self.issues.append(f"{self.invalid_salaries} jobs with invalid salary range")
             else:
                 print("   ✅ All salary ranges valid")
             
             # Check for outliers
-            avg_min = salary_df['salary_min'].mean()
-            outliers = salary_df[salary_df['salary_min'] > avg_min * 3]
+            avg_min = salary_mins.mean()
+            outliers = int(np.count_nonzero(salary_mins > avg_min * 3))
             
-            if len(outliers) > 0:
-                print(f"   ℹ️  {len(outliers)} potential salary outliers (>3x average)")
+            if outliers > 0:
+                print(f"   ℹ️  {outliers} potential salary outliers (>3x average)")
         else:
             print("   ℹ️  No salary data to validate")
         
         print()
     
-    def check_url_validity(self, df):
+    def check_url_validity(self):
         """Check URL formats"""
         print("🔗 URL VALIDITY CHECK")
         print("-" * 60)
         
-        import re
-        url_pattern = re.compile(r'https?://[^\s]+')
-        
-        invalid_urls = 0
-        for url in df['url']:
-            if pd.notna(url) and not url_pattern.match(str(url)):
-                invalid_urls += 1
-        
-        if invalid_urls > 0:
-            print(f"   ⚠️  {invalid_urls} invalid URLs")
-            self.issues.append(f"{invalid_urls} invalid URLs")
+        if self.invalid_urls > 0:
+            print(f"   ⚠️  {self.invalid_urls} invalid URLs")
+            self.issues.append(f"{self.invalid_urls} invalid URLs")
         else:
             print("   ✅ All URLs valid")
         
         print()
     
-    def check_text_quality(self, df):
+    def check_text_quality(self):
         """Check text field quality"""
         print("📝 TEXT QUALITY CHECK")
         print("-" * 60)
         
         # Check for very short descriptions
-        if 'description' in df.columns:
-            short_desc = df[df['description'].str.len() < 50]
-            if len(short_desc) > 0:
-                print(f"   ℹ️  {len(short_desc)} jobs with short descriptions (<50 chars)")
+        if self.short_descriptions > 0:
+            print(f"   ℹ️  {self.short_descriptions} jobs with short descriptions (<50 chars)")
         
         # Check for very long requirements
-        if 'requirements' in df.columns:
-            long_req = df[df['requirements'].str.len() > 1000]
-            if len(long_req) > 0:
-                print(f"   ℹ️  {len(long_req)} jobs with very long requirements (>1000 chars)")
+        if self.long_requirements > 0:
+            print(f"   ℹ️  {self.long_requirements} jobs with very long requirements (>1000 chars)")
         
         print("   ✅ Text quality checks complete")
         print()
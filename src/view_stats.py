@@ -1,62 +1,90 @@
 from database import Database
-from collections import Counter
+import sys
 
-db = Database()
-conn = db.get_connection()
-cursor = conn.cursor()
+def main():
+    """Print job counts by source, location, company and day"""
+    db = Database()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    
+    print("=" * 60)
+    print("📊 JOB MARKET DATABASE STATISTICS")
+    print("=" * 60)
+    
+    # All sections in one round-trip: each row is tagged with the section it
+    # belongs to, and pos keeps each section's own ordering
+    cursor.execute("""
+        WITH by_source AS (
+            SELECT source AS label, COUNT(*) AS cnt
+            FROM jobs 
+            GROUP BY source
+        ),
+        by_location AS (
+            SELECT location AS label, COUNT(*) AS cnt 
+            FROM jobs 
+            GROUP BY location 
+            ORDER BY cnt DESC 
+            LIMIT 10
+        ),
+        by_company AS (
+            SELECT company AS label, COUNT(*) AS cnt 
+            FROM jobs 
+            GROUP BY company 
+            ORDER BY cnt DESC 
+            LIMIT 10
+        ),
+        by_day AS (
+            SELECT DATE(scraped_at) AS date, COUNT(*) AS cnt 
+            FROM jobs 
+            GROUP BY DATE(scraped_at) 
+            ORDER BY date DESC 
+            LIMIT 7
+        )
+        SELECT 'total', NULL, COUNT(*), 1 FROM jobs
+        UNION ALL
+        SELECT 'source', label, cnt, ROW_NUMBER() OVER (ORDER BY cnt DESC) FROM by_source
+        UNION ALL
+        SELECT 'location', label, cnt, ROW_NUMBER() OVER (ORDER BY cnt DESC) FROM by_location
+        UNION ALL
+        SELECT 'company', label, cnt, ROW_NUMBER() OVER (ORDER BY cnt DESC) FROM by_company
+        UNION ALL
+        SELECT 'day', date::text, cnt, ROW_NUMBER() OVER (ORDER BY date DESC) FROM by_day
+        ORDER BY 1, 4
+    """)
+    
+    sections = {'total': [], 'source': [], 'location': [], 'company': [], 'day': []}
+    for tag, label, count, _ in cursor:
+        sections[tag].append((label, count))
+    
+    # Total jobs
+    total = sections['total'][0][1]
+    print(f"\n📈 Total Jobs: {total}")
+    
+    # By source
+    print(f"\n🔹 By Source:")
+    for source, count in sections['source']:
+        print(f"   • {source}: {count} jobs")
+    
+    # By location (top 10)
+    print(f"\n🌍 Top 10 Locations:")
+    for location, count in sections['location']:
+        print(f"   • {location}: {count} jobs")
+    
+    # Top companies
+    print(f"\n🏢 Top 10 Companies Hiring:")
+    for company, count in sections['company']:
+        print(f"   • {company}: {count} jobs")
+    
+    # Recent activity
+    print(f"\n📅 Recent Scraping Activity:")
+    for date, count in sections['day']:
+        print(f"   • {date}: {count} jobs")
+    
+    print("\n" + "=" * 60)
+    
+    cursor.close()
+    db.return_connection(conn)
 
-print("=" * 60)
-print("📊 JOB MARKET DATABASE STATISTICS")
-print("=" * 60)
-
-# Total jobs
-cursor.execute("SELECT COUNT(*) FROM jobs")
-total = cursor.fetchone()[0]
-print(f"\n📈 Total Jobs: {total}")
-
-# By source
-cursor.execute("SELECT source, COUNT(*) FROM jobs GROUP BY source ORDER BY COUNT(*) DESC")
-print(f"\n🔹 By Source:")
-for source, count in cursor.fetchall():
-    print(f"   • {source}: {count} jobs")
-
-# By location (top 10)
-cursor.execute("""
-    SELECT location, COUNT(*) as cnt 
-    FROM jobs 
-    GROUP BY location 
-    ORDER BY cnt DESC 
-    LIMIT 10
-""")
-print(f"\n🌍 Top 10 Locations:")
-for location, count in cursor.fetchall():
-    print(f"   • {location}: {count} jobs")
-
-# Top companies
-cursor.execute("""
-    SELECT company, COUNT(*) as cnt 
-    FROM jobs 
-    GROUP BY company 
-    ORDER BY cnt DESC 
-    LIMIT 10
-""")
-print(f"\n🏢 Top 10 Companies Hiring:")
-for company, count in cursor.fetchall():
-    print(f"   • {company}: {count} jobs")
-
-# Recent activity
-cursor.execute("""
-    SELECT DATE(scraped_at) as date, COUNT(*) as cnt 
-    FROM jobs 
-    GROUP BY DATE(scraped_at) 
-    ORDER BY date DESC 
-    LIMIT 7
-""")
-print(f"\n📅 Recent Scraping Activity:")
-for date, count in cursor.fetchall():
-    print(f"   • {date}: {count} jobs")
-
-print("\n" + "=" * 60)
-
-cursor.close()
-db.return_connection(conn)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=False)
+    main()
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import psycopg2
+import psycopg2.errors
+from psycopg2 import pool
+
+# Fixture rows: (job_id, title, company); ids follow insertion order
+FIXTURE_JOBS = [
+    ('remote-1', 'Senior Python Engineer', 'Acme'),
+    ('remote-2', 'Senior Python Engineer II', 'acme '),      # similar title, same company key
+    ('remote-3', 'Senior Python Engineer', 'Globex'),        # same title, other company
+    ('remote-1', 'Python Engineer', 'Initech'),              # exact ID match with the first row
+    (None, 'Data Analyst', 'Initech'),                       # NULL job_ids pair as exact matches
+    (None, 'Data Analyst', 'Initech'),
+    ('remote-4', None, 'Hooli'),                             # NULL titles compare as '' == ''
+    ('remote-5', None, 'Hooli'),
+    ('remote-6', 'Frontend Developer', 'Hooli'),
+    ('remote-7', 'Backend Developer', 'Hooli'),
+]
+
+SCHEMA = 'duplicate_detector_test'
+
+class DuplicatePathsTest(unittest.TestCase):
+    """find_duplicates_in_db and find_duplicates_local agree on a fixture table"""
+
+    @classmethod
+    def setUpClass(cls):
+        from duplicate_detector import DuplicateDetector
+
+        # Only run against a database named explicitly for tests, never the .env one
+        test_db = os.getenv('TEST_DB_NAME')
+        if not test_db:
+            raise unittest.SkipTest("TEST_DB_NAME not set")
+
+        saved_db_name = os.environ.get('DB_NAME')
+        os.environ['DB_NAME'] = test_db
+        try:
+            cls.detector = DuplicateDetector()
+        except psycopg2.OperationalError as e:
+            raise unittest.SkipTest(f"Postgres unavailable: {e}")
+        finally:
+            if saved_db_name is None:
+                del os.environ['DB_NAME']
+            else:
+                os.environ['DB_NAME'] = saved_db_name
+
+        db = cls.detector.db
+        with db.connection() as conn, conn.cursor() as cursor:
+            try:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except psycopg2.errors.InsufficientPrivilege as e:
+                conn.rollback()
+                db.connection_pool.closeall()
+                raise unittest.SkipTest(f"Can't create pg_trgm: {e}")
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+            cursor.execute(f"""
+                CREATE TABLE {SCHEMA}.jobs (
+                    id SERIAL PRIMARY KEY,
+                    job_id VARCHAR(255),
+                    title VARCHAR(500),
+                    company VARCHAR(500),
+                    url VARCHAR(1000),
+                    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_active BOOLEAN DEFAULT TRUE
+                )
+            """)
+            cursor.executemany(
+                f"INSERT INTO {SCHEMA}.jobs (job_id, title, company) VALUES (%s, %s, %s)",
+                FIXTURE_JOBS
+            )
+            conn.commit()
+
+        # Point the detector's pool at the fixture schema
+        db.connection_pool.closeall()
+        db.connection_pool = pool.ThreadedConnectionPool(
+            1, 4, options=f'-c search_path={SCHEMA},public', **db.connect_params
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        db = cls.detector.db
+        with db.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.commit()
+        db.connection_pool.closeall()
+
+    def pair_set(self, duplicates):
+        return {(frozenset((d['job1_id'], d['job2_id'])), d['reason']) for d in duplicates}
+
+    def test_db_path_matches_local_path(self):
+        in_db = self.detector.find_duplicates_in_db(0.85)
+        local = self.detector.find_duplicates_local(0.85, workers=1)
+
+        self.assertEqual(self.pair_set(in_db), self.pair_set(local))
+
+    def test_null_job_ids_and_titles(self):
+        pairs = self.pair_set(self.detector.find_duplicates_in_db(0.85))
+
+        self.assertIn((frozenset((1, 4)), 'Exact ID match'), pairs)
+        self.assertIn((frozenset((5, 6)), 'Exact ID match'), pairs)
+        self.assertIn((frozenset((7, 8)), 'Similar title at same company'), pairs)
+        self.assertIn((frozenset((1, 2)), 'Similar title at same company'), pairs)
+        self.assertNotIn((frozenset((1, 3)), 'Similar title at same company'), pairs)
+
+if __name__ == '__main__':
+    unittest.main()